@@ -0,0 +1,176 @@
+"""Throughput, latency, rate-limit adherence and memory benchmark for the UMLS client.
+
+Runs every endpoint method against a local stub UTS server (see
+stub_server.py) for a range of batch sizes and prints one row per run.
+Each run's client lives in a fresh subprocess, so ``peak_rss_mb`` is that
+run's own peak and excludes the stub server and earlier runs:
+
+    python benchmarks/bench.py --batch-sizes 1 100 10000 --rate 500 --latency 0.02
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_server import StubConfig, StubUTSServer  # noqa: E402
+from umls_api_client.retry import RetryPolicy  # noqa: E402
+from umls_api_client.UMLS import UMLS  # noqa: E402
+
+
+def _cuis(n):
+    return [f"C{i:07d}" for i in range(n)]
+
+
+def _codes(n):
+    return [str(100000 + i) for i in range(n)]
+
+
+# method name -> (id generator, extra keyword arguments)
+ENDPOINTS = {
+    "retrieve_cui_info": (_cuis, {}),
+    "retrieve_cui_atoms": (_cuis, {}),
+    "retrieve_cui_definitions": (_cuis, {}),
+    "retrieve_cui_relations": (_cuis, {}),
+    "retrieve_cuis": (lambda n: [f"term {i}" for i in range(n)], {}),
+    "retrieve_tui_info": (lambda n: [f"T{i:03d}" for i in range(n)], {}),
+    "retrieve_source_asserted_id_info": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_atoms": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_parents": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_children": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_ancestors": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_descendants": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_relations": (_codes, {"source": "SNOMEDCT_US"}),
+    "retrieve_source_asserted_id_attributes": (_codes, {"source": "SNOMEDCT_US"}),
+    "crosswalk_vocabs_using_cuis": (_codes, {"source": "ICD10CM"}),
+}
+
+PAGED = {name for name in ENDPOINTS if name not in (
+    "retrieve_cui_info", "retrieve_tui_info", "retrieve_source_asserted_id_info", "retrieve_source_asserted_id_atoms")}
+
+
+def _percentile(values, q):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _run_client(base_url:str, method:str, batch_size:int, args, conn):
+    make_ids, kwargs = ENDPOINTS[method]
+    if args.all_pages and method in PAGED:
+        kwargs = {**kwargs, "all_pages": True}
+    ids = make_ids(batch_size)
+
+    umls = UMLS("benchmark", base_url=base_url, requests_per_second=args.rate, burst=args.burst,
+                max_workers=args.workers, memory_cache_size=args.memory_cache, retry=RetryPolicy(backoff_factor=0.05))
+    latencies = []
+    session_get = umls._session.get
+
+    def timed_get(*a, **kw):
+        start = time.perf_counter()
+        try:
+            return session_get(*a, **kw)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    umls._session.get = timed_get
+
+    with umls:
+        start = time.perf_counter()
+        if args.streaming:
+            for _ in getattr(umls.streaming(window=args.workers or 64), method)(ids, **kwargs):
+                pass
+            errors = None
+        else:
+            results = getattr(umls, method)(ids, **kwargs)
+            errors = len(results.errors)
+        elapsed = time.perf_counter() - start
+
+    conn.send({
+        "seconds": elapsed,
+        "latencies": latencies,
+        "errors": errors,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    })
+    conn.close()
+
+
+def run_one(server:StubUTSServer, method:str, batch_size:int, args) -> dict:
+    server.reset()
+    # A spawned child starts from a clean interpreter: its ru_maxrss is this run's alone.
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    child = ctx.Process(target=_run_client, args=(server.base_url, method, batch_size, args, sender))
+    child.start()
+    sender.close()
+    try:
+        run = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"benchmark client for {method} (batch size {batch_size}) failed") from None
+    finally:
+        receiver.close()
+        child.join()
+
+    elapsed, latencies = run["seconds"], run["latencies"]
+    requests_sent = len(server.request_times)
+    return {
+        "method": method,
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 3),
+        "requests": requests_sent,
+        "requests_per_sec": round(requests_sent / elapsed, 1) if elapsed else None,
+        "ids_per_sec": round(batch_size / elapsed, 1) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else None,
+        "max_per_second": server.max_requests_per_window(1.0),
+        "rate_limit": args.rate,
+        "errors": run["errors"],
+        "peak_rss_mb": run["peak_rss_mb"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--methods", nargs="+", default=list(ENDPOINTS), choices=list(ENDPOINTS), metavar="METHOD")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 10, 100, 1000])
+    parser.add_argument("--rate", type=float, default=500, help="client requests_per_second")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None, help="client max_workers")
+    parser.add_argument("--memory-cache", type=int, default=0)
+    parser.add_argument("--streaming", action="store_true", help="use the streaming view instead of batch calls")
+    parser.add_argument("--all-pages", action="store_true", help="follow pagination on paged endpoints")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub server latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--results-per-id", type=int, default=25)
+    parser.add_argument("--name-length", type=int, default=32)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--json", dest="json_path", help="also write the rows to this JSON file")
+    args = parser.parse_args(argv)
+
+    config = StubConfig(latency=args.latency, latency_jitter=args.latency_jitter, results_per_id=args.results_per_id,
+                        name_length=args.name_length, throttle_rate=args.throttle_rate)
+    rows = []
+    columns = ("method", "batch_size", "seconds", "requests_per_sec", "p50_ms", "p99_ms", "max_per_second",
+               "errors", "peak_rss_mb")
+    print("  ".join(f"{c:>14}" if c != "method" else f"{c:<40}" for c in columns))
+    with StubUTSServer(config) as server:
+        for method in args.methods:
+            for batch_size in args.batch_sizes:
+                row = run_one(server, method, batch_size, args)
+                rows.append(row)
+                print("  ".join(f"{row[c]!s:>14}" if c != "method" else f"{row[c]:<40}" for c in columns), flush=True)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
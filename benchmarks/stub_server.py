@@ -0,0 +1,181 @@
+"""Local stand-in for the UTS REST API, for benchmarking the client offline.
+
+Every endpoint the client calls answers with synthetic, correctly shaped
+JSON. Latency, payload size, result counts (and so pagination) and the
+share of 429 responses are configurable, and the arrival time of every
+request is recorded so rate-limit adherence can be checked afterwards.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubConfig:
+    def __init__(self, latency:float=0.05, latency_jitter:float=0.0, results_per_id:int=25, name_length:int=32,
+                 throttle_rate:float=0.0, retry_after:float=0.1, not_found_rate:float=0.0):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.results_per_id = results_per_id
+        self.name_length = name_length
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.not_found_rate = not_found_rate
+
+
+def _item(kind:str, id:str, i:int, name:str) -> dict:
+    if kind == "atoms":
+        return {"classType": "Atom", "ui": f"A{i:07d}", "name": name, "termType": "PT", "language": "ENG",
+                "rootSource": "SNOMEDCT_US", "code": f"{id}-{i}", "concept": id, "obsolete": False, "suppressible": False}
+    if kind == "definitions":
+        return {"classType": "Definition", "value": name, "rootSource": "MSH", "sourceOriginated": True}
+    if kind == "relations":
+        return {"classType": "ConceptRelation", "ui": f"R{i:08d}", "relationLabel": "RO", "additionalRelationLabel": "",
+                "rootSource": "MSH", "relatedId": f"C{i:07d}", "relatedIdName": name, "obsolete": False, "suppressible": False}
+    if kind == "attributes":
+        return {"classType": "Attribute", "ui": f"AT{i:07d}", "name": "CTV3ID", "value": name, "rootSource": "SNOMEDCT_US"}
+    if kind == "search":
+        return {"ui": f"C{i:07d}", "rootSource": "MTH", "name": name}
+    if kind == "crosswalk":
+        return {"classType": "SourceAtomCluster", "ui": f"{id}.{i}", "name": name, "rootSource": "SNOMEDCT_US"}
+    # parents, children, ancestors, descendants
+    return {"classType": "SourceAtomCluster", "ui": f"{id}.{i}", "name": name, "rootSource": "SNOMEDCT_US"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StubUTSServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status:int, payload:dict, headers:dict | None=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        config = self.server.config
+        self.server.record_request()
+        delay = config.latency + random.uniform(0, config.latency_jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        if config.throttle_rate and random.random() < config.throttle_rate:
+            return self._send(429, {"error": "Too Many Requests"}, {"Retry-After": str(config.retry_after)})
+        if config.not_found_rate and random.random() < config.not_found_rate:
+            return self._send(404, {"error": "Not Found"})
+
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        page_number = int(params.get("pageNumber", 1))
+        page_size = int(params.get("pageSize", 25))
+        name = "x" * config.name_length
+
+        if "search" in parts:
+            kind, id = "search", params.get("string", "")
+        elif parts and parts[-1] in ("atoms", "definitions", "relations", "attributes", "parents", "children",
+                                     "ancestors", "descendants"):
+            kind, id = parts[-1], parts[-2]
+        elif "crosswalk" in parts:
+            kind, id = "crosswalk", parts[-1]
+        else:
+            # single-object endpoints: CUI, TUI and source-asserted id info
+            id = parts[-1] if parts else ""
+            return self._send(200, {"pageSize": 25, "pageNumber": 1, "pageCount": 1, "result": {
+                "classType": "Concept", "ui": id, "name": name, "semanticTypes": [{"name": "Disease or Syndrome"}],
+                "atomCount": config.results_per_id, "rootSource": "MTH",
+            }})
+
+        total = config.results_per_id
+        start = (page_number - 1) * page_size
+        items = [_item(kind, id, i, name) for i in range(start, min(start + page_size, total))]
+        if kind == "search":
+            return self._send(200, {"pageSize": page_size, "pageNumber": page_number,
+                                    "result": {"classType": "searchResults", "results": items}})
+        self._send(200, {"pageSize": page_size, "pageNumber": page_number,
+                         "pageCount": max(1, -(-total // page_size)), "result": items})
+
+
+class StubUTSServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default of 5 drops bursts of new connections
+
+    def __init__(self, config:StubConfig | None=None, host:str="127.0.0.1", port:int=0):
+        super().__init__((host, port), _Handler)
+        self.config = config or StubConfig()
+        self.request_times = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/rest"
+
+    def record_request(self):
+        with self._lock:
+            self.request_times.append(time.monotonic())
+
+    def reset(self):
+        with self._lock:
+            self.request_times = []
+
+    def max_requests_per_window(self, window:float=1.0) -> int:
+        """The largest number of requests that arrived within any ``window`` seconds."""
+        with self._lock:
+            times = sorted(self.request_times)
+        best = 0
+        start = 0
+        for end, t in enumerate(times):
+            while t - times[start] > window:
+                start += 1
+            best = max(best, end - start + 1)
+        return best
+
+    def start(self) -> "StubUTSServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--results-per-id", type=int, default=25)
+    parser.add_argument("--name-length", type=int, default=32)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = StubConfig(latency=args.latency, latency_jitter=args.latency_jitter, results_per_id=args.results_per_id,
+                        name_length=args.name_length, throttle_rate=args.throttle_rate)
+    server = StubUTSServer(config, port=args.port)
+    print(f"stub UTS server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+import asyncio
+import copy
+import time
+
+try:
+    import aiohttp
+except ImportError as e:  # pragma: no cover
+    raise ImportError("AsyncUMLS requires aiohttp: pip install 'umls_api_client[async]'") from e
+
+from . import models
+from .cache import ResponseCache
+from .hierarchy import DIRECTIONS
+from .instrumentation import endpoint_label
+from .results import BatchError, BatchResult
+from .retry import THROTTLE_STATUSES
+from .UMLS import CONCEPT_PARTS, PAGE_WINDOW, UMLS, _json_loads, _page_items, _stream_ids
+
+
+class _LazySession:
+    # Holder shared by a client and its streaming views; the aiohttp session
+    # itself can only be created once an event loop is running.
+    def __init__(self):
+        self.session = None
+        self.semaphore = None
+
+
+async def _aiter_sync(iterable):
+    for item in iterable:
+        yield item
+
+
+async def _parse_items(items):
+    async for item in items:
+        yield models.parse_item(item)
+
+
+class AsyncUMLS(UMLS):
+    """asyncio flavour of :class:`UMLS`.
+
+    Every ``retrieve_*`` method takes the same arguments as on ``UMLS`` but
+    returns an awaitable. Requests run as coroutines on one aiohttp session,
+    at most ``max_concurrency`` at a time, and draw from the same kind of
+    token bucket (which may be shared with a synchronous client).
+    """
+
+    def __init__(self, api_key:str, max_concurrency:int=100, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self._max_concurrency = max_concurrency
+        # Unless pool_maxsize is given, allow a connection for every concurrent request.
+        self._connection_limit = kwargs.get("pool_maxsize", max_concurrency)
+
+    def _create_session(self):
+        return _LazySession()
+
+    def _client_timeout(self):
+        if self._timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(self._timeout, tuple):
+            connect, read = self._timeout
+            return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=self._timeout)
+
+    def _get_session(self):
+        lazy = self._session
+        if lazy.session is None or lazy.session.closed:
+            connector = aiohttp.TCPConnector(limit=self._connection_limit, force_close=not self._keep_alive)
+            lazy.session = aiohttp.ClientSession(connector=connector, timeout=self._client_timeout())
+            lazy.semaphore = asyncio.Semaphore(self._max_concurrency)
+        return lazy.session
+
+    async def close(self):
+        if self._owns_session and self._session.session is not None:
+            await self._session.session.close()
+            self._session.session = None
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+        if self._owns_cache:
+            self._cache.close()
+        if self._owns_rate_limiter:
+            self._rate_limiter.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("use 'async with' with AsyncUMLS")
+
+    async def _get(self, search_endpoint:str, params:dict, headers:dict):
+        if self._backend is not None:
+            return self._backend.get(search_endpoint, params)
+
+        key = ResponseCache.make_key(search_endpoint, params)[0]
+        if self._memory_cache is not None:
+            cached = self._memory_cache.get(key)
+            if self._instrumentation is not None:
+                self._instrumentation.on_cache("memory", cached is not None)
+            if cached is not None:
+                return cached
+
+        flight = self._inflight.get(key)
+        owner = flight is None
+        if owner:
+            flight = self._inflight[key] = [asyncio.ensure_future(self._fetch(search_endpoint, params, headers)), 0]
+            flight[0].add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            flight[1] += 1
+        # shield: a cancelled caller must not cancel the lookup for everyone else sharing it
+        data = await asyncio.shield(flight[0])
+        if not owner:
+            # Every caller gets its own copy of a shared response.
+            return copy.deepcopy(data)
+        if self._memory_cache is not None:
+            self._memory_cache.set(key, data)
+        return copy.deepcopy(data) if flight[1] else data
+
+    async def _fetch(self, search_endpoint:str, params:dict, headers:dict):
+        hooks = self._instrumentation
+        if self._cache is not None:
+            cached = self._cache.get(search_endpoint, params)
+            if hooks is not None:
+                hooks.on_cache("disk", cached is not None)
+            if cached is not None:
+                return cached
+
+        endpoint = endpoint_label(search_endpoint, self._base_url) if hooks is not None else None
+        session = self._get_session()
+        attempt = 0
+        queued_at = time.monotonic()
+        async with self._session.semaphore:
+            if hooks is not None:
+                hooks.on_queue_wait(time.monotonic() - queued_at)
+            while True:
+                wait = self._rate_limiter.reserve()
+                if hooks is not None:
+                    hooks.on_rate_limit_wait(endpoint, wait)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if hooks is not None:
+                    self._on_wire(1)
+                    started = time.perf_counter()
+                status, body = None, b""
+                try:
+                    async with session.get(search_endpoint, params=params, headers=headers) as response:
+                        status = response.status
+                        body = await response.read()
+                        if response.ok or not self._retry.should_retry(attempt, status):
+                            response.raise_for_status()  # Raise an error for non-200 responses
+                            data = _json_loads(body)
+                            break
+                        delay = self._retry.delay(attempt, response.headers.get("Retry-After"))
+                        if status in THROTTLE_STATUSES:
+                            self._rate_limiter.throttle(delay)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if not self._retry.should_retry(attempt):
+                        raise
+                    delay = self._retry.delay(attempt)
+                finally:
+                    if hooks is not None:
+                        self._on_wire(-1)
+                        hooks.on_request(endpoint, status, time.perf_counter() - started, len(body))
+                if hooks is not None:
+                    hooks.on_retry(endpoint, attempt, delay, status)
+                await asyncio.sleep(delay)
+                attempt += 1
+        self._rate_limiter.recover()
+        if self._cache is not None:
+            self._cache.set(search_endpoint, params, data)
+        return data
+
+    async def _iter_pages(self, search_endpoint:str, params:dict, headers:dict):
+        first = await self._get(search_endpoint, params, headers)
+        items = _page_items(first)
+        for item in items:
+            yield item
+
+        page_number = int(params.get("pageNumber", 1))
+        page_count = first.get("pageCount")
+        if page_count is None:
+            page_size = int(params.get("pageSize", 25))
+            while len(items) >= page_size:
+                page_number += 1
+                items = _page_items(await self._get(search_endpoint, {**params, "pageNumber": page_number}, headers))
+                for item in items:
+                    yield item
+            return
+
+        pending = []
+        try:
+            for page in range(page_number + 1, page_count + 1):
+                pending.append(asyncio.ensure_future(self._get(search_endpoint, {**params, "pageNumber": page}, headers)))
+                if len(pending) >= PAGE_WINDOW:
+                    for item in _page_items(await pending.pop(0)):
+                        yield item
+            while pending:
+                for item in _page_items(await pending.pop(0)):
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _get_all_pages(self, search_endpoint:str, params:dict, headers:dict):
+        return [item async for item in self._iter_pages(search_endpoint, params, headers)]
+
+    def _fetcher(self, all_pages:bool):
+        fetch = self._get_all_pages if all_pages else self._get
+        if not self._typed:
+            return fetch
+
+        async def parsed(*request):
+            return models.parse(await fetch(*request))
+        return parsed
+
+    async def _stream(self, id_list, build_request, all_pages:bool, fetch=None):
+        if isinstance(id_list, str):
+            id_list = [id_list]
+        fetch = fetch or self._fetcher(all_pages)
+        if hasattr(id_list, "__aiter__"):
+            ids = (id.rstrip("\r\n") async for id in id_list if id.strip())
+        else:
+            ids = _aiter_sync(_stream_ids(id_list))
+        pending = {}
+        try:
+            async for id in ids:
+                pending[asyncio.ensure_future(fetch(*build_request(id)))] = id
+                if len(pending) >= self._stream_window:
+                    break
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    async for next_id in ids:
+                        pending[asyncio.ensure_future(fetch(*build_request(next_id)))] = next_id
+                        break
+                    id = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = BatchError(e)
+                    yield id, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _resolve_normalized(self, queries:dict, searchTypes:list[str], kwargs:dict) -> tuple[dict, dict]:
+        resolved, misses = {}, {}
+        pending = list(queries)
+        for searchType in searchTypes:
+            if not pending:
+                break
+            batch = self._normalized_batch(queries, pending)
+            results = await self._batch_view().retrieve_cuis(list(batch), searchType=searchType, **kwargs)
+            pending = self._collect_normalized(results, batch, resolved, misses)
+        return resolved, misses
+
+    async def retrieve_cuis_normalized(self, mentions, searchTypes:list[str]=['exact','normalizedString','words'],
+                                       surfaceSearchType:str | None=None, **kwargs):
+        groups = self._normalized_groups(mentions, kwargs)
+        resolved, misses = await self._resolve_normalized(self._group_queries(groups), searchTypes, kwargs)
+        surface = ({}, {})
+        if surfaceSearchType is not None:
+            surface = await self._resolve_normalized(self._surface_queries(groups, misses), [surfaceSearchType], kwargs)
+        return self._fan_out(groups, resolved, misses, surface)
+
+    async def traverse(self, source:str, roots:list[str] | str, direction:str='children', max_depth:int | None=None,
+                       version:str='current'):
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        if isinstance(roots, str):
+            roots = [roots]
+        graph = self.hierarchy(source, version)
+        fetch = getattr(self._batch_view(), f"retrieve_source_asserted_id_{direction}")
+        seen = set(roots)
+        frontier = list(seen)
+        errors = {}
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            to_fetch = self._expansion_ids(graph, frontier, direction)
+            if to_fetch:
+                fetched = await fetch(to_fetch, source, version=version, all_pages=True)
+                self._record_expansion(graph, fetched, direction, errors)
+            next_frontier = []
+            for code in frontier:
+                for neighbour in graph.neighbours(code, direction):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+            depth += 1
+        return self._traversal_result(graph, roots, direction, max_depth, errors)
+
+    async def build_crosswalk(self, source:str, codes:list[str], targetSource:list[str]=[], version:str='current',
+                              pageSize:int=100):
+        table = self.crosswalk_table(source, targetSource, version)
+        missing = table.missing([codes] if isinstance(codes, str) else codes)
+        fetched = BatchResult()
+        if missing:
+            fetched = await self._batch_view().crosswalk_vocabs_using_cuis(missing, source, version=version,
+                                                                          targetSource=targetSource, pageSize=pageSize, all_pages=True)
+        return self._record_crosswalk(table, fetched)
+
+    async def _concept_bundle(self, cui:str, builders:dict):
+        # The parts of one CUI run as concurrent coroutines under the shared semaphore and rate limiter.
+        bundle = [{}, len(builders), None]
+        fetches = [self._fetcher(all_pages)(*build_request(cui))
+                   for build_request, all_pages in builders.values()]
+        for part, outcome in zip(builders, await asyncio.gather(*fetches, return_exceptions=True)):
+            self._bundle_part(bundle, part, outcome)
+        if bundle[2] is not None:
+            raise bundle[2].exception
+        return bundle[0]
+
+    def retrieve_concepts(self, cui_list:list[str] | str, parts:list[str]=list(CONCEPT_PARTS), version:str='current',
+                          all_pages:bool=False, options:dict[str, dict] | None=None):
+        builders = self._concept_requests(parts, version, all_pages, options)
+        fetch = lambda cui: self._concept_bundle(cui, builders)
+        if self._stream_window is not None:
+            return self._stream(cui_list, lambda cui: (cui,), False, fetch)
+        return self._run_async(cui_list, lambda cui: (cui,), False, fetch)
+
+    def _run(self, id_list:list[str] | str, build_request, all_pages:bool=False):
+        # Streaming views and single-id all_pages calls return async generators;
+        # everything else is awaitable.
+        if self._capture_requests:
+            return build_request, all_pages
+        if self._stream_window is not None:
+            return self._stream(id_list, build_request, all_pages)
+        if isinstance(id_list, str) and all_pages:
+            items = self._iter_pages(*build_request(id_list))
+            return _parse_items(items) if self._typed else items
+        return self._run_async(id_list, build_request, all_pages)
+
+    async def _run_async(self, id_list:list[str] | str, build_request, all_pages:bool, fetch=None):
+        fetch = fetch or self._fetcher(all_pages)
+        if isinstance(id_list, str):
+            return await fetch(*build_request(id_list))
+
+        id_list = list(dict.fromkeys(id_list))
+        responses = await asyncio.gather(*(fetch(*build_request(id)) for id in id_list), return_exceptions=True)
+        results = BatchResult(lambda failed: self._run_async(failed, build_request, all_pages, fetch))
+        for id, response in zip(id_list, responses):
+            if isinstance(response, Exception):
+                results.errors[id] = BatchError(response)
+            elif isinstance(response, BaseException):
+                raise response
+            else:
+                results[id] = response
+        return results
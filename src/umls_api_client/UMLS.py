@@ -1,21 +1,633 @@
+import copy
+import json
+import math
+import threading
+import time
 import requests
-from ratelimit import limits, sleep_and_retry
-from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+
+from . import models
+from .cache import MemoryCache, ResponseCache
+from .crosswalk import CrosswalkTable
+from .hierarchy import DIRECTIONS, HierarchyGraph
+from .instrumentation import Instrumentation, endpoint_label
+from .normalize import group_mentions
+from .ratelimiter import TokenBucket
+from .results import BatchError, BatchResult
+from .retry import THROTTLE_STATUSES, RetryPolicy
+from .scheduler import PriorityExecutor, priority_level
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 REQ_PER_SEC=15
+PAGE_WINDOW=8
+# retrieve_concepts part -> the endpoint method that fetches it
+CONCEPT_PARTS = {
+    "info": "retrieve_cui_info",
+    "atoms": "retrieve_cui_atoms",
+    "definitions": "retrieve_cui_definitions",
+    "relations": "retrieve_cui_relations",
+}
+
+_worker = threading.local()
+
+
+def _call_in_worker(fn, *args, submitted_at:float | None=None, instrumentation:Instrumentation | None=None):
+    if instrumentation is not None:
+        instrumentation.on_queue_wait(time.monotonic() - submitted_at)
+    _worker.active = True
+    try:
+        return fn(*args)
+    finally:
+        _worker.active = False
+
+
+def _stream_ids(id_list):
+    # Streaming input is often a file: drop line endings and skip blank lines.
+    for id in id_list:
+        id = id.rstrip("\r\n")
+        if id.strip():
+            yield id
+
+
+def _page_items(payload:dict) -> list:
+    result = payload.get("result", [])
+    if isinstance(result, dict):
+        # /search nests its hits under result.results and marks an empty page with ui NONE
+        if "results" not in result:
+            return [result]
+        return [item for item in result["results"] if item.get("ui") != "NONE"]
+    return result
 
 class UMLS:
-    
+    _capture_requests = False
 
-    def __init__(self, api_key:str, requests_per_second:int=20):
+    def __init__(self, api_key:str, requests_per_second:int=20, burst:int=1, rate_limit_file:str | None=None,
+                 rate_limiter:TokenBucket | None=None, base_url:str="https://uts-ws.nlm.nih.gov/rest",
+                 pool_connections:int=1, pool_maxsize:int=32, keep_alive:bool=True,
+                 timeout:float | tuple[float, float] | None=(10, 60), cache:ResponseCache | str | None=None,
+                 memory_cache_size:int=0, retry:RetryPolicy | None=None, max_workers:int | None=None,
+                 expected_latency:float=0.5, executor:Executor | None=None, hierarchy_path:str | None=None,
+                 backend=None, instrumentation:Instrumentation | None=None, crosswalk_path:str | None=None):
         self._api_key = api_key
-        self._base_url = "https://uts-ws.nlm.nih.gov/rest"
+        self._base_url = base_url.rstrip('/')
         self._requests_per_second = requests_per_second 
         self.REQ_PER_SEC=self._requests_per_second        
+        # One bucket per client (or per host, via rate_limit_file) so that
+        # concurrent calls to different endpoints share the same budget.
+        self._owns_rate_limiter = rate_limiter is None
+        if rate_limiter is None:
+            rate_limiter = TokenBucket(requests_per_second, burst=burst, shared_path=rate_limit_file)
+        self._rate_limiter = rate_limiter
+        self._retry = retry if retry is not None else RetryPolicy()
+
+        self._owns_cache = isinstance(cache, str)
+        if self._owns_cache:
+            cache = ResponseCache(cache)
+        self._cache = cache
+        self._memory_cache = MemoryCache(memory_cache_size) if memory_cache_size else None
+        # Requests currently on the wire, so identical concurrent lookups share one response.
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._stream_window = None
+        self._typed = False
+
+        # One long-lived pool for every endpoint. By default it is sized so that
+        # enough requests are in flight to keep the rate limiter busy at the
+        # expected round-trip latency, with some headroom.
+        self._owns_executor = executor is None
+        if executor is None:
+            if max_workers is None:
+                max_workers = max(4, math.ceil(requests_per_second * expected_latency * 2))
+            executor = PriorityExecutor(max_workers, thread_name_prefix="umls")
+        self._executor = executor
+        self._priority = priority_level("normal")
+        self._deadline = None
+
+        self._timeout = timeout
+        self._pool_connections = pool_connections
+        # Each worker may hold a connection; a smaller pool would discard them and lose keep-alive.
+        self._pool_maxsize = max(pool_maxsize, max_workers) if self._owns_executor else pool_maxsize
+        self._keep_alive = keep_alive
+        self._session = self._create_session()
+        self._owns_session = True
+
+        self._hierarchy_path = hierarchy_path
+        self._hierarchies = {}
+        self._crosswalk_path = crosswalk_path
+        self._crosswalk_tables = {}
+
+        # An offline backend (e.g. rrf.RRFBackend) answers get(url, params) locally
+        # instead of the REST service: no rate limit, caching or threads needed.
+        self._backend = backend
+
+        self._instrumentation = instrumentation
+        self._requests_on_wire = [0]  # a holder, so every view updates the same gauge
+        self._requests_on_wire_lock = threading.Lock()
+
+    def _create_session(self):
+        # A single pooled session reuses TCP/TLS connections across calls;
+        # urllib3's pool is safe to share between the executor's threads.
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self._keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        # Views share everything with the client they came from; only that client closes it.
+        if self._owns_executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        if self._owns_session:
+            self._session.close()
+        if self._owns_cache:
+            self._cache.close()
+        if self._owns_rate_limiter:
+            self._rate_limiter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def cache_stats(self) -> dict:
+        return {
+            "memory": self._memory_cache.stats() if self._memory_cache is not None else None,
+            "disk": self._cache.stats() if self._cache is not None else None,
+        }
+
+    def _get(self, search_endpoint:str, params:dict, headers:dict):
+        if self._backend is not None:
+            return self._backend.get(search_endpoint, params)
+
+        key = ResponseCache.make_key(search_endpoint, params)[0]
+        if self._memory_cache is not None:
+            cached = self._memory_cache.get(key)
+            if self._instrumentation is not None:
+                self._instrumentation.on_cache("memory", cached is not None)
+            if cached is not None:
+                return cached
+
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[key] = [Future(), 0]
+            else:
+                flight[1] += 1
+        if not owner:
+            # Every caller gets its own copy of a shared response.
+            return copy.deepcopy(flight[0].result())
+
+        try:
+            data = self._fetch(search_endpoint, params, headers)
+        except BaseException as e:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight[0].set_exception(e)
+            raise
+        if self._memory_cache is not None:
+            self._memory_cache.set(key, data)
+        with self._inflight_lock:
+            shared = self._inflight.pop(key)[1]  # nobody can join from here on
+        flight[0].set_result(data)
+        return copy.deepcopy(data) if shared else data
+
+    def _on_wire(self, delta:int):
+        with self._requests_on_wire_lock:
+            self._requests_on_wire[0] += delta
+            count = self._requests_on_wire[0]
+        self._instrumentation.on_inflight(count)
+
+    def _fetch(self, search_endpoint:str, params:dict, headers:dict):
+        hooks = self._instrumentation
+        if self._cache is not None:
+            cached = self._cache.get(search_endpoint, params)
+            if hooks is not None:
+                hooks.on_cache("disk", cached is not None)
+            if cached is not None:
+                return cached
+
+        endpoint = endpoint_label(search_endpoint, self._base_url) if hooks is not None else None
+        attempt = 0
+        while True:
+            waited = self._rate_limiter.acquire(priority=self._priority)
+            if hooks is not None:
+                hooks.on_rate_limit_wait(endpoint, waited)
+                self._on_wire(1)
+                started = time.perf_counter()
+            response = None
+            try:
+                response = self._session.get(search_endpoint, params=params,headers=headers,timeout=self._timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if not self._retry.should_retry(attempt):
+                    raise
+                status = None
+                delay = self._retry.delay(attempt)
+            else:
+                if response.ok or not self._retry.should_retry(attempt, response.status_code):
+                    break
+                status = response.status_code
+                delay = self._retry.delay(attempt, response.headers.get("Retry-After"))
+                if status in THROTTLE_STATUSES:
+                    self._rate_limiter.throttle(delay)
+            finally:
+                if hooks is not None:
+                    self._on_wire(-1)
+                    hooks.on_request(endpoint, None if response is None else response.status_code,
+                                     time.perf_counter() - started, 0 if response is None else len(response.content))
+            if hooks is not None:
+                hooks.on_retry(endpoint, attempt, delay, status)
+            time.sleep(delay)
+            attempt += 1
+
+        response.raise_for_status()  # Raise an error for non-200 responses
+        self._rate_limiter.recover()
+        data = _json_loads(response.content)
+        if self._cache is not None:
+            self._cache.set(search_endpoint, params, data)
+        return data
+
+    def _submit(self, fn, *args) -> Future:
+        if self._backend is not None or getattr(_worker, "active", False):
+            # Already running on one of our workers (e.g. the pages of one id in a
+            # batch), or answering locally: run inline rather than via the pool.
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        kwargs = {}
+        if self._instrumentation is not None:
+            kwargs = {"submitted_at": time.monotonic(), "instrumentation": self._instrumentation}
+        if isinstance(self._executor, PriorityExecutor):
+            deadline = time.monotonic() + self._deadline if self._deadline is not None else None
+            return self._executor.schedule(self._priority, deadline, _call_in_worker, fn, *args, **kwargs)
+        return self._executor.submit(_call_in_worker, fn, *args, **kwargs)
+
+    def _iter_pages(self, search_endpoint:str, params:dict, headers:dict):
+        first = self._get(search_endpoint, params, headers)
+        items = _page_items(first)
+        yield from items
+
+        page_number = int(params.get("pageNumber", 1))
+        page_count = first.get("pageCount")
+        if page_count is None:
+            # /search does not report pageCount: keep going until a page comes back short
+            page_size = int(params.get("pageSize", 25))
+            while len(items) >= page_size:
+                page_number += 1
+                items = _page_items(self._get(search_endpoint, {**params, "pageNumber": page_number}, headers))
+                yield from items
+            return
+
+        # The rest of the pages are fetched concurrently, PAGE_WINDOW at a time, and yielded in order.
+        pending = deque()
+        try:
+            for page in range(page_number + 1, page_count + 1):
+                pending.append(self._submit(self._get, search_endpoint, {**params, "pageNumber": page}, headers))
+                if len(pending) >= PAGE_WINDOW:
+                    yield from _page_items(pending.popleft().result())
+            while pending:
+                yield from _page_items(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _get_all_pages(self, search_endpoint:str, params:dict, headers:dict):
+        return list(self._iter_pages(search_endpoint, params, headers))
+
+    def _view(self) -> "UMLS":
+        # A shallow copy sharing this client's resources; closing it leaves them open.
+        view = copy.copy(self)
+        view._owns_executor = view._owns_session = view._owns_cache = view._owns_rate_limiter = False
+        return view
+
+    def streaming(self, window:int=64) -> "UMLS":
+        """Return a view of this client whose batch methods are generators.
+
+        On the view, every ``retrieve_*`` method accepts any iterable of ids
+        (e.g. an open file, one id per line; blank lines are skipped), keeps
+        at most ``window`` requests in flight and yields ``(id, result)`` as
+        each completes. Failed lookups yield a :class:`BatchError` as the result. The view
+        shares the session, rate limiter and caches of this client.
+        """
+        view = self._view()
+        view._stream_window = window
+        return view
+
+    def prioritized(self, priority:str | int='interactive', deadline:float | None=None) -> "UMLS":
+        """Return a view of this client whose requests run at ``priority``.
+
+        ``priority`` is ``"interactive"``, ``"normal"`` (the default for
+        plain calls), ``"bulk"`` or any int (lower is more urgent). Queued
+        work on the shared worker pool and waiters on the rate limiter are
+        served most urgent first, so interactive lookups overtake a large
+        batch already in progress while the batch keeps the leftover rate.
+        Within a class, requests with an earlier ``deadline`` (seconds from
+        the call) are started first.
+        """
+        view = self._view()
+        view._priority = priority_level(priority)
+        view._deadline = deadline
+        return view
+
+    def typed(self) -> "UMLS":
+        """Return a view of this client whose endpoint methods return parsed records.
+
+        Every response goes through :func:`models.parse`: a response page
+        becomes a :class:`models.Page`, and the items of an ``all_pages`` call
+        become a list of records. Batch, streaming and ``retrieve_concepts``
+        results are parsed per id. The view shares the session, rate limiter
+        and caches of this client.
+        """
+        view = self._view()
+        view._typed = True
+        return view
+
+    def _batch_view(self) -> "UMLS":
+        # Composite methods (traverse, build_crosswalk, retrieve_cuis_normalized)
+        # consume BatchResults of raw JSON, so on a streaming or typed view they call a plain one.
+        if self._stream_window is None and not self._typed:
+            return self
+        view = self._view()
+        view._stream_window = None
+        view._typed = False
+        return view
+
+    def _fetcher(self, all_pages:bool):
+        # Fetches one id's response (or every page's items); a typed view also parses it.
+        fetch = self._get_all_pages if all_pages else self._get
+        if not self._typed:
+            return fetch
+        return lambda *request: models.parse(fetch(*request))
+
+    def _stream(self, id_list, build_request, all_pages:bool):
+        if isinstance(id_list, str):
+            id_list = [id_list]
+        fetch = self._fetcher(all_pages)
+        ids = _stream_ids(id_list)
+        pending = {}
+        try:
+            for id in ids:
+                pending[self._submit(fetch, *build_request(id))] = id
+                if len(pending) >= self._stream_window:
+                    break
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # Refill the window before handing the result over, so the
+                    # next request is already on its way while the caller works.
+                    for next_id in ids:
+                        pending[self._submit(fetch, *build_request(next_id))] = next_id
+                        break
+                    id = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = BatchError(e)
+                    yield id, result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def hierarchy(self, source:str, version:str='current') -> HierarchyGraph:
+        key = (source, version)
+        if key not in self._hierarchies:
+            self._hierarchies[key] = HierarchyGraph(source, version, path=self._hierarchy_path)
+        return self._hierarchies[key]
+
+    def _expansion_ids(self, graph:HierarchyGraph, frontier:list[str], direction:str) -> list[str]:
+        return [code for code in frontier if not graph.is_expanded(code, direction)]
+
+    def _record_expansion(self, graph:HierarchyGraph, fetched:BatchResult, direction:str, errors:dict):
+        for code, items in fetched.items():
+            graph.set_neighbours(code, [item["ui"] for item in items], direction)
+        for code, error in fetched.errors.items():
+            if error.status_code == 404:
+                graph.set_neighbours(code, [], direction)  # UTS answers 404 for a node without children/parents
+            else:
+                errors[code] = error  # left unexpanded, so a later walk retries it
+
+    def _traversal_result(self, graph:HierarchyGraph, roots:list[str], direction:str, max_depth:int | None,
+                          errors:dict) -> BatchResult:
+        graph.save()
+        result = BatchResult()
+        result.update((root, graph.closure(root, direction, max_depth)) for root in roots)
+        result.errors = errors
+        return result
+
+    def traverse(self, source:str, roots:list[str] | str, direction:str='children', max_depth:int | None=None,
+                 version:str='current'):
+        """Breadth-first walk of a source hierarchy from ``roots``.
+
+        Each level's unexpanded nodes are fetched concurrently through
+        ``retrieve_source_asserted_id_children``/``_parents``; everything
+        learned is kept in :meth:`hierarchy` (and persisted with
+        ``hierarchy_path``), so overlapping or repeated walks only fetch
+        nodes never seen before. Returns a :class:`BatchResult` of
+        ``{root: {code: depth}}``; nodes that could not be expanded are in
+        its ``errors`` as ``{code: BatchError}`` and are retried by the next walk.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of {DIRECTIONS}")
+        if isinstance(roots, str):
+            roots = [roots]
+        graph = self.hierarchy(source, version)
+        fetch = getattr(self._batch_view(), f"retrieve_source_asserted_id_{direction}")
+        seen = set(roots)
+        frontier = list(seen)
+        errors = {}
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            to_fetch = self._expansion_ids(graph, frontier, direction)
+            if to_fetch:
+                fetched = fetch(to_fetch, source, version=version, all_pages=True)
+                self._record_expansion(graph, fetched, direction, errors)
+            next_frontier = []
+            for code in frontier:
+                for neighbour in graph.neighbours(code, direction):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+            depth += 1
+        return self._traversal_result(graph, roots, direction, max_depth, errors)
+
+    def crosswalk_table(self, source:str, targetSource:list[str]=[], version:str='current') -> CrosswalkTable:
+        key = (source, tuple(sorted(targetSource)), version)
+        if key not in self._crosswalk_tables:
+            self._crosswalk_tables[key] = CrosswalkTable(source, targetSource, version, path=self._crosswalk_path)
+        return self._crosswalk_tables[key]
+
+    def _record_crosswalk(self, table:CrosswalkTable, fetched:BatchResult) -> CrosswalkTable:
+        for code, items in fetched.items():
+            table.set_mappings(code, items)
+        errors = {}
+        for code, error in fetched.errors.items():
+            if error.status_code == 404:
+                table.set_mappings(code, [])  # UTS answers 404 for a code without mappings
+            else:
+                errors[code] = error
+        table.save()
+        table.errors = errors
+        return table
+
+    def build_crosswalk(self, source:str, codes:list[str], targetSource:list[str]=[], version:str='current',
+                        pageSize:int=100) -> CrosswalkTable:
+        """Fetch the crosswalk mappings of every code in ``codes`` not already in
+        :meth:`crosswalk_table` (all pages, concurrently) and return the table.
+
+        Translations are then local lookups, e.g. ``table.translate(codes, 'SNOMEDCT_US')``;
+        with ``crosswalk_path`` the table is persisted and later runs only fetch unseen codes.
+        Codes whose lookup failed are left out of the table and reported in
+        ``table.errors`` as ``{code: BatchError}``, so the next build retries them.
+        """
+        table = self.crosswalk_table(source, targetSource, version)
+        missing = table.missing([codes] if isinstance(codes, str) else codes)
+        fetched = BatchResult()
+        if missing:
+            fetched = self._batch_view().crosswalk_vocabs_using_cuis(missing, source, version=version,
+                                                                    targetSource=targetSource, pageSize=pageSize, all_pages=True)
+        return self._record_crosswalk(table, fetched)
+
+    def _concept_requests(self, parts:list[str], version:str, all_pages:bool, options:dict | None) -> dict:
+        # part -> (build_request, all_pages), captured from the endpoint method that serves it
+        unknown = [part for part in parts if part not in CONCEPT_PARTS]
+        if unknown:
+            raise ValueError(f"unknown concept parts {unknown}; choose from {list(CONCEPT_PARTS)}")
+        view = self._view()
+        view._capture_requests = True
+        builders = {}
+        for part in dict.fromkeys(parts):
+            kwargs = {**(options or {}).get(part, {}), "version": version}
+            if all_pages and part != "info":
+                kwargs["all_pages"] = True
+            builders[part] = getattr(view, CONCEPT_PARTS[part])([], **kwargs)
+        return builders
+
+    @staticmethod
+    def _bundle_part(bundle:list, part:str, outcome):
+        # bundle is [parts, parts outstanding, first error]; outcome is a response or the exception raised
+        bundle[1] -= 1
+        if not isinstance(outcome, BaseException):
+            bundle[0][part] = outcome
+            return
+        if not isinstance(outcome, Exception):
+            raise outcome
+        error = BatchError(outcome)
+        if part == "info" or error.status_code != 404:
+            bundle[2] = bundle[2] or error
+        else:
+            bundle[0][part] = None  # UTS answers 404 for a CUI without definitions etc.
+
+    def _concept_bundles(self, cui_list, builders:dict, window:int | None):
+        # Every part of every CUI goes through the one worker pool and rate
+        # limiter; a CUI's bundle is yielded as soon as its last part arrives.
+        # With a window, at most that many CUIs are in flight at once.
+        cuis = iter(cui_list)
+        pending = {}
+        bundles = {}
+
+        def start(cui):
+            bundles[cui] = [{}, len(builders), None]
+            for part, (build_request, all_pages) in builders.items():
+                pending[self._submit(self._fetcher(all_pages), *build_request(cui))] = cui, part
+
+        try:
+            for cui in cuis:
+                if cui not in bundles:
+                    start(cui)
+                if window is not None and len(bundles) >= window:
+                    break
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cui, part = pending.pop(future)
+                    bundle = bundles[cui]
+                    self._bundle_part(bundle, part, future.exception() or future.result())
+                    if bundle[1]:
+                        continue
+                    del bundles[cui]
+                    if window is not None:
+                        for next_cui in cuis:
+                            if next_cui not in bundles:
+                                start(next_cui)
+                                break
+                    yield cui, bundle[2] or {part: bundle[0][part] for part in builders}
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def retrieve_concepts(self, cui_list:list[str] | str, parts:list[str]=list(CONCEPT_PARTS), version:str='current',
+                          all_pages:bool=False, options:dict[str, dict] | None=None):
+        """Fetch several parts of each CUI (``info``, ``atoms``, ``definitions``,
+        ``relations``) in one pipelined call and return ``{cui: {part: response}}``.
+
+        The sub-requests of all CUIs are interleaved on the shared worker pool
+        and rate limiter instead of running one batch per part. ``all_pages``
+        follows pagination for the paged parts, and ``options`` passes extra
+        arguments per part, e.g. ``{"atoms": {"sabs": ["MSH"]}}``. A part the
+        server answers with 404 is None in the bundle. On a :meth:`streaming`
+        view, ``(cui, bundle)`` is yielded as each bundle completes.
+        """
+        builders = self._concept_requests(parts, version, all_pages, options)
+        if self._stream_window is not None:
+            cui_list = [cui_list] if isinstance(cui_list, str) else cui_list
+            return self._concept_bundles(_stream_ids(cui_list), builders, self._stream_window)
+        if isinstance(cui_list, str):
+            for _, bundle in self._concept_bundles([cui_list], builders, None):
+                if isinstance(bundle, BatchError):
+                    raise bundle.exception
+                return bundle
+
+        results = BatchResult(lambda failed: self.retrieve_concepts(failed, parts, version, all_pages, options))
+        for cui, bundle in self._concept_bundles(cui_list, builders, None):
+            if isinstance(bundle, BatchError):
+                results.errors[cui] = bundle
+            else:
+                results[cui] = bundle
+        return results
+
+    def _run(self, id_list:list[str] | str, build_request, all_pages:bool=False):
+        # build_request maps one id to the (url, params, headers) of its request.
+        # With all_pages, a single id yields the items of every page as they arrive
+        # and a batch maps each id to the merged list of items. Batches return a
+        # BatchResult so that one failing id doesn't lose the others.
+        if self._capture_requests:
+            return build_request, all_pages
+        if self._stream_window is not None:
+            return self._stream(id_list, build_request, all_pages)
+        if isinstance(id_list, str):
+            if all_pages:
+                items = self._iter_pages(*build_request(id_list))
+                return map(models.parse_item, items) if self._typed else items
+            return self._fetcher(False)(*build_request(id_list))
+
+        fetch = self._fetcher(all_pages)
+        id_list = dict.fromkeys(id_list)  # duplicate ids are only requested once
+        results = BatchResult(lambda failed: self._run(failed, build_request, all_pages))
+        futures = {self._submit(fetch, *build_request(id)): id for id in id_list}
+        for future, id in futures.items():
+            try:
+                results[id] = future.result()
+            except Exception as e:
+                results.errors[id] = BatchError(e)
+        return results
     
 
     def retrieve_cui_atoms(self, cui_list:list[str] | str, version:str='current', preferred:bool=False,includeObsolete:bool=True,includeSuppressible:bool=True,sabs:list[str]=[],language:str='',ttys:list[str]=[]
-                          ,pageNumber:int=1,pageSize:int=25):
+                          ,pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         params = {
             "apiKey": self._api_key,
             "pageNumber":pageNumber,
@@ -50,28 +662,17 @@ class UMLS:
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
       
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_cui_atom(cui):
+        def cui_atom_request(cui):
 
             search_endpoint = f"{self._base_url}/content/{version}/CUI/{cui}/atoms"
             if preferred:
                 search_endpoint += "/"+"preferred"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(cui_list, str):
-            return fetch_cui_atom(cui_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_cui_atom,cui): cui for cui in cui_list}
-            results = {cui: future.result() for future, cui in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(cui_list, cui_atom_request, all_pages=all_pages)
         
 
-    def retrieve_cui_definitions(self, cui_list:list[str] | str, version:str='current',sabs:list[str]=[], pageNumber:int=1, pageSize:int=25):
+    def retrieve_cui_definitions(self, cui_list:list[str] | str, version:str='current',sabs:list[str]=[], pageNumber:int=1, pageSize:int=25,all_pages:bool=False):
         
         params = {
             "apiKey": self._api_key,
@@ -88,25 +689,14 @@ class UMLS:
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_cui_definition(cui):
+        def cui_definition_request(cui):
             search_endpoint = f"{self._base_url}/content/{version}/CUI/{cui}/definitions"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(cui_list, str):
-            return fetch_cui_definition(cui_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_cui_definition,cui): cui for cui in cui_list}
-            results = {cui: future.result() for future, cui in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(cui_list, cui_definition_request, all_pages=all_pages)
         
     def retrieve_cui_relations(self, cui_list:list[str] | str, version:str='current', includeRelationLabels:list[str]=[],includeAdditionalRelationLabels:list[str]=[],includeObsolete:bool=False,includeSuppressible:bool=False,sabs:list[str]=[]
-                          ,pageNumber:int=1,pageSize:int=25):
+                          ,pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         
         params = {
             "apiKey": self._api_key,
@@ -145,22 +735,11 @@ class UMLS:
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_cui_relations(cui):
+        def cui_relations_request(cui):
             search_endpoint = f"{self._base_url}/content/{version}/CUI/{cui}/relations"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(cui_list, str):
-            return fetch_cui_relations(cui_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_cui_relations,cui): cui for cui in cui_list}
-            results = {cui: future.result() for future, cui in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(cui_list, cui_relations_request, all_pages=all_pages)
         
     def retrieve_source_asserted_id_info(self,id_list:list[str] | str,source:str,version:str='current'):
         params = {
@@ -169,22 +748,11 @@ class UMLS:
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_info(id):
+        def source_asserted_id_info_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_info(id_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_info,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(id_list, source_asserted_id_info_request)
 
 
     def retrieve_source_asserted_id_atoms(self,id_list:list[str] | str,source:str,version:str='current'):
@@ -195,24 +763,13 @@ class UMLS:
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_atoms(id):
+        def source_asserted_id_atoms_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/atoms"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_atoms(id_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_atoms,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(id_list, source_asserted_id_atoms_request)
     
-    def retrieve_source_asserted_id_parents(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25):
+    def retrieve_source_asserted_id_parents(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         params = {
             "apiKey": self._api_key,
             "pageNumber":pageNumber,
@@ -221,24 +778,13 @@ class UMLS:
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_parents(id):
+        def source_asserted_id_parents_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/parents"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_parents(id_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_parents,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(id_list, source_asserted_id_parents_request, all_pages=all_pages)
     
-    def retrieve_source_asserted_id_children(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25):
+    def retrieve_source_asserted_id_children(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         params = {
             "apiKey": self._api_key,
             "pageNumber":pageNumber,
@@ -246,24 +792,13 @@ class UMLS:
         }
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_children(id):
+        def source_asserted_id_children_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/children"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_children(id_list)
-        
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_children,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+            return search_endpoint, params, headers
 
-    def retrieve_source_asserted_id_ancestors(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25):
+        return self._run(id_list, source_asserted_id_children_request, all_pages=all_pages)
+
+    def retrieve_source_asserted_id_ancestors(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         params = {
             "apiKey": self._api_key,
             "pageNumber":pageNumber,
@@ -271,24 +806,13 @@ class UMLS:
         }
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_ancestors(id):
+        def source_asserted_id_ancestors_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/ancestors"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_ancestors(id_list)
-        
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_ancestors,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+            return search_endpoint, params, headers
+
+        return self._run(id_list, source_asserted_id_ancestors_request, all_pages=all_pages)
     
-    def retrieve_source_asserted_id_descendants(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25):
+    def retrieve_source_asserted_id_descendants(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
        
         params = {
             "apiKey": self._api_key,
@@ -298,25 +822,14 @@ class UMLS:
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_descendants(id):
+        def source_asserted_id_descendants_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/descendants"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_descendants(id_list)
-        
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_descendants,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+            return search_endpoint, params, headers
+
+        return self._run(id_list, source_asserted_id_descendants_request, all_pages=all_pages)
         
     def retrieve_source_asserted_id_relations(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,
-                                              includeRelationLabels:list[str]=[],includeAdditionalRelationLabels:list[str]=[],includeObsolete:bool=False,includeSuppressible:bool=False):
+                                              includeRelationLabels:list[str]=[],includeAdditionalRelationLabels:list[str]=[],includeObsolete:bool=False,includeSuppressible:bool=False,all_pages:bool=False):
         
         params = {
             "apiKey": self._api_key,
@@ -348,24 +861,13 @@ class UMLS:
 
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_relations(id):
+        def source_asserted_id_relations_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/relations"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_relations(id_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_relations,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(id_list, source_asserted_id_relations_request, all_pages=all_pages)
         
-    def retrieve_source_asserted_id_attributes(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,includeAttributeNames:list[str]=[]):
+    def retrieve_source_asserted_id_attributes(self,id_list:list[str] | str,source:str,version:str='current',pageNumber:int=1,pageSize:int=25,includeAttributeNames:list[str]=[],all_pages:bool=False):
         
         params = {
             "apiKey": self._api_key,
@@ -381,22 +883,11 @@ class UMLS:
         
       
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_source_asserted_id_attributes(id):
+        def source_asserted_id_attributes_request(id):
             search_endpoint = f"{self._base_url}/content/{version}/source/{source}/{id}/attributes"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_source_asserted_id_attributes(id_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_source_asserted_id_attributes,id): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(id_list, source_asserted_id_attributes_request, all_pages=all_pages)
     
     def retrieve_tui_info(self,tui_list:list[str] | str,version:str='current'):
         
@@ -406,24 +897,13 @@ class UMLS:
             
       
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_tui_info(tui):
+        def tui_info_request(tui):
             search_endpoint = f"{self._base_url}/semantic-network/{version}/TUI/{tui}"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(tui_list, str):
-            return fetch_tui_info(tui_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_tui_info,tui): tui for tui in tui_list}
-            results = {tui: future.result() for future, tui in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(tui_list, tui_info_request)
     
-    def crosswalk_vocabs_using_cuis(self,cui_list:list[str] | str,source:str,version:str='current',targetSource:list[str]=[],includeObsolete:bool=False,pageNumber:int=1,pageSize:int=25):
+    def crosswalk_vocabs_using_cuis(self,cui_list:list[str] | str,source:str,version:str='current',targetSource:list[str]=[],includeObsolete:bool=False,pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         
         params = {
             "apiKey": self._api_key,
@@ -435,7 +915,7 @@ class UMLS:
             params["targetSource"] = targetSource[0]
         elif(len(targetSource)>1):
             targetSourceString = ','.join(targetSource)
-            params["includeAdditionalRelationLabels"] = targetSourceString
+            params["targetSource"] = targetSourceString
         
         if (includeObsolete):
             params["includeObsolete"] = 'true'
@@ -444,25 +924,14 @@ class UMLS:
       
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
 
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_crosswalk_vocabs_using_cui(cui):
+        def crosswalk_vocabs_using_cui_request(cui):
             search_endpoint = f"{self._base_url}/crosswalk/{version}/source/{source}/{cui}"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(cui_list, str):
-            return fetch_crosswalk_vocabs_using_cui(cui_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_crosswalk_vocabs_using_cui,cui): cui for cui in cui_list}
-            results = {cui: future.result() for future, cui in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(cui_list, crosswalk_vocabs_using_cui_request, all_pages=all_pages)
     
     def retrieve_cuis(self, id_list:list[str] | str, version:str='current',inputType:str='atom',includeObsolete:bool=False,includeSuppressible:bool=False,returnIdType:str='concept',sabs:list[str]=[],
-                     searchType:str='words',partialSearch:bool=False,pageNumber:int=1,pageSize:int=25):
+                     searchType:str='words',partialSearch:bool=False,pageNumber:int=1,pageSize:int=25,all_pages:bool=False):
         search_endpoint = f"{self._base_url}/search/{version}"
 
         params = {
@@ -496,43 +965,111 @@ class UMLS:
             params["sabs"] = sabsString
 
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_cui(id, params_local):
+        def cui_request(id):
+            params_local = params.copy()
             params_local["string"] = id
-            response = requests.get(search_endpoint, params=params_local,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-        
-        if isinstance(id_list, str):
-            return fetch_cui(id_list,params.copy())
+            return search_endpoint, params_local, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_cui,id,params.copy()): id for id in id_list}
-            results = {id: future.result() for future, id in futures.items()}
-            # ordered_results = [results[id] for id in id_list]
-        return results
+        return self._run(id_list, cui_request, all_pages=all_pages)
     
 
+    def _normalized_groups(self, mentions, kwargs:dict) -> dict[str, list[str]]:
+        if isinstance(mentions, str):
+            raise TypeError("mentions must be an iterable of strings, not a single str")
+        if "searchType" in kwargs:
+            raise TypeError("retrieve_cuis_normalized takes searchTypes=[...], not searchType")
+        return group_mentions(mentions)
+
+    def _group_queries(self, groups:dict) -> dict[str, str]:
+        # canonical -> search string: the mention itself when the group has a
+        # single surface form, otherwise the canonical form shared by all of them.
+        queries = {}
+        for canonical, mentions in groups.items():
+            forms = {" ".join(mention.split()) for mention in mentions}
+            queries[canonical] = forms.pop() if len(forms) == 1 else canonical
+        return queries
+
+    def _surface_queries(self, groups:dict, misses:dict) -> dict[str, str]:
+        # mention -> search string, for the members of groups whose shared query found nothing
+        return {mention: " ".join(mention.split())
+                for canonical in misses if len(groups[canonical]) > 1 for mention in groups[canonical]}
+
+    def _normalized_batch(self, queries:dict, pending:list) -> dict[str, list]:
+        batch = {}
+        for key in pending:
+            batch.setdefault(queries[key], []).append(key)
+        return batch
+
+    def _collect_normalized(self, results:BatchResult, batch:dict, resolved:dict, misses:dict) -> list:
+        pending = []
+        for query, keys in batch.items():
+            hit = query in results and _page_items(results[query])
+            for key in keys:
+                if hit:
+                    resolved[key] = results[query]
+                    misses.pop(key, None)
+                else:
+                    misses[key] = results[query] if query in results else results.errors[query]
+                    pending.append(key)
+        return pending
+
+    def _resolve_normalized(self, queries:dict, searchTypes:list[str], kwargs:dict) -> tuple[dict, dict]:
+        # Try each searchType in turn for the keys still missing; returns (resolved, misses) by key.
+        resolved, misses = {}, {}
+        pending = list(queries)
+        for searchType in searchTypes:
+            if not pending:
+                break
+            batch = self._normalized_batch(queries, pending)
+            results = self._batch_view().retrieve_cuis(list(batch), searchType=searchType, **kwargs)
+            pending = self._collect_normalized(results, batch, resolved, misses)
+        return resolved, misses
+
+    def _fan_out(self, groups:dict, resolved:dict, misses:dict, surface:tuple[dict, dict]) -> BatchResult:
+        surface_resolved, surface_misses = surface
+        results = BatchResult()
+        for canonical, mentions in groups.items():
+            for mention in mentions:
+                if mention in surface_resolved or mention in surface_misses:
+                    outcome = surface_resolved.get(mention, surface_misses.get(mention))
+                else:
+                    outcome = resolved.get(canonical, misses.get(canonical))
+                if isinstance(outcome, BatchError):
+                    results.errors[mention] = outcome
+                else:
+                    results[mention] = outcome
+        return results
+
+    def retrieve_cuis_normalized(self, mentions, searchTypes:list[str]=['exact','normalizedString','words'],
+                                 surfaceSearchType:str | None=None, **kwargs):
+        """Bulk ``retrieve_cuis`` for raw text mentions.
+
+        Mentions that differ only by case, whitespace, punctuation or regular
+        plural form are grouped and searched once: by the mention itself if
+        the group has one surface form, otherwise by the canonical form. Each
+        ``searchType`` is tried in order, later ones only for the groups the
+        earlier ones missed. With ``surfaceSearchType`` (e.g. ``'exact'``), a
+        group of several surface forms that misses them all is searched again
+        one surface form at a time, with that one search type only. Every
+        mention gets the response found for it (a miss is the last empty
+        response). Other keyword arguments go to ``retrieve_cuis``, except
+        ``searchType``.
+        """
+        groups = self._normalized_groups(mentions, kwargs)
+        resolved, misses = self._resolve_normalized(self._group_queries(groups), searchTypes, kwargs)
+        surface = ({}, {})
+        if surfaceSearchType is not None:
+            surface = self._resolve_normalized(self._surface_queries(groups, misses), [surfaceSearchType], kwargs)
+        return self._fan_out(groups, resolved, misses, surface)
+
     def retrieve_cui_info(self, cui_list:list[str] | str, version:str='current'):
         
         params = {"apiKey":self._api_key}
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        @sleep_and_retry
-        @limits(calls=self.REQ_PER_SEC, period=1)
-        def fetch_cui_info(cui):
+        def cui_info_request(cui):
             search_endpoint = f"{self._base_url}/content/{version}/CUI/{cui}"
-            response = requests.get(search_endpoint, params=params,headers=headers)
-            response.raise_for_status()  # Raise an error for non-200 responses
-            return response.json()
-
-        if isinstance(cui_list, str):
-            return fetch_cui_info(cui_list)
+            return search_endpoint, params, headers
 
-        with ThreadPoolExecutor() as executor:
-            futures = {executor.submit(fetch_cui_info,cui): cui for cui in cui_list}
-            results = {cui: future.result() for future, cui in futures.items()}
-            # ordered_results = [results[cui] for cui in cui_list]
-        return results
+        return self._run(cui_list, cui_info_request)
     
         
\ No newline at end of file
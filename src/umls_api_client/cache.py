@@ -0,0 +1,165 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+    _dumps, _loads = orjson.dumps, orjson.loads
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(value) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+_VERSION_RE = re.compile(r"/(?:content|search|semantic-network|crosswalk)/([^/]+)")
+
+
+class ResponseCache:
+    """SQLite-backed cache of decoded UMLS responses.
+
+    Entries are keyed by endpoint path plus the sorted request parameters
+    (``apiKey`` is never part of the key) and namespaced by the release in
+    the path. Responses for ``current`` expire after ``ttl`` seconds; pinned
+    releases such as ``2024AA`` do not change and are kept until evicted,
+    unless ``pinned_ttl`` says otherwise. Once more than ``max_entries`` are
+    stored, the least recently used ones are dropped.
+    """
+
+    def __init__(self, path:str=":memory:", ttl:float | None=86400, pinned_ttl:float | None=None,
+                 max_entries:int | None=1_000_000):
+        self.path = path
+        self.ttl = ttl
+        self.pinned_ttl = pinned_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " version TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(url:str, params:dict) -> tuple[str, str]:
+        path = urlsplit(url).path
+        match = _VERSION_RE.search(path)
+        version = match.group(1) if match else ""
+        items = sorted((k, str(v)) for k, v in params.items() if k != "apiKey")
+        return path + "?" + "&".join(f"{k}={v}" for k, v in items), version
+
+    def _ttl_for(self, version:str) -> float | None:
+        return self.ttl if version in ("", "current") else self.pinned_ttl
+
+    def get(self, url:str, params:dict):
+        key, _ = self.make_key(url, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, url:str, params:dict, value):
+        key, version = self.make_key(url, params)
+        now = time.time()
+        ttl = self._ttl_for(version)
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            existed = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, version, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, version, json.dumps(value, separators=(",", ":")), expires_at, now),
+            )
+            if not existed:
+                self._size += 1
+            if self.max_entries is not None and self._size > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now:float):
+        # Trim to 90% of the limit so that eviction doesn't run on every insert.
+        self._conn.execute("DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        target = int(self.max_entries * 0.9)
+        excess = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - target
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def clear(self, version:str | None=None):
+        with self._lock:
+            if version is None:
+                self._conn.execute("DELETE FROM responses")
+            else:
+                self._conn.execute("DELETE FROM responses WHERE version = ?", (version,))
+            self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MemoryCache:
+    """Bounded in-process LRU of decoded responses, keyed like :class:`ResponseCache`.
+
+    Responses are kept serialized, so every hit is a fresh copy that the
+    caller is free to mutate.
+    """
+
+    def __init__(self, maxsize:int=4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key:str):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _loads(value)
+
+    def set(self, key:str, value):
+        value = _dumps(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
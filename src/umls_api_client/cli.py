@@ -0,0 +1,157 @@
+"""Stream ids or search strings through a UMLS endpoint and write NDJSON.
+
+    umls-api retrieve_cui_atoms cuis.txt --rate 20 --all-pages > atoms.ndjson
+    cut -f1 codes.tsv | umls-api crosswalk_vocabs_using_cuis -p source=ICD10CM -p targetSource=SNOMEDCT_US
+"""
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+
+from .cache import ResponseCache
+from .results import BatchError
+from .UMLS import UMLS
+
+
+METHODS = sorted(name for name in dir(UMLS)
+                 if name.startswith(("retrieve_", "crosswalk_")) and name != "retrieve_cuis_normalized")
+
+
+def _method_params(method:str) -> dict:
+    # Keyword parameters of an endpoint method, without the id list.
+    params = list(inspect.signature(getattr(UMLS, method)).parameters.values())[2:]
+    return {p.name: p for p in params if p.name != "all_pages"}
+
+
+def _convert(param:inspect.Parameter, value:str):
+    default = param.default
+    if isinstance(default, list):
+        return [v for v in value.split(",") if v]
+    if isinstance(default, bool):
+        return value.lower() in ("1", "true", "yes", "y")
+    if isinstance(default, int):
+        return int(value)
+    return value
+
+
+def _parse_params(parser:argparse.ArgumentParser, method:str, pairs:list[str]) -> dict:
+    allowed = _method_params(method)
+    kwargs = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep or name not in allowed:
+            parser.error(f"{method} takes -p NAME=VALUE with NAME one of: {', '.join(allowed)}")
+        kwargs[name] = _convert(allowed[name], value)
+    missing = [n for n, p in allowed.items() if p.default is inspect.Parameter.empty and n not in kwargs]
+    if missing:
+        parser.error(f"{method} requires -p {missing[0]}=...")
+    return kwargs
+
+
+def _read_ids(paths:list[str], ids:list[str]):
+    yield from ids
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in f:
+                yield line.strip()  # blank lines are skipped by the streaming view
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+class _Progress:
+    def __init__(self, interval:float):
+        self.interval = interval
+        self.start = self.last = time.monotonic()
+        self.done = self.failed = 0
+
+    def update(self, failed:bool):
+        self.done += 1
+        self.failed += failed
+        if self.interval and time.monotonic() - self.last >= self.interval:
+            self.report()
+
+    def report(self, end:str="\r"):
+        self.last = time.monotonic()
+        elapsed = self.last - self.start
+        rate = self.done / elapsed if elapsed else 0.0
+        sys.stderr.write(f"{self.done} done, {self.failed} failed, {rate:.1f}/s, {elapsed:.0f}s{end}")
+        sys.stderr.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="umls-api", description=__doc__.splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="\n".join(__doc__.splitlines()[1:]))
+    parser.add_argument("method", choices=METHODS, metavar="METHOD", help="endpoint method, e.g. retrieve_cui_info")
+    parser.add_argument("inputs", nargs="*", metavar="FILE",
+                        help="files with one id or string per line ('-' for stdin, the default)")
+    parser.add_argument("--id", dest="ids", action="append", default=[], help="an id to look up (repeatable)")
+    parser.add_argument("-p", "--param", dest="params", action="append", default=[], metavar="NAME=VALUE",
+                        help="method parameter; list parameters take comma-separated values")
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output file (default stdout)")
+    parser.add_argument("--api-key", default=os.environ.get("UMLS_API_KEY"), help="defaults to $UMLS_API_KEY")
+    parser.add_argument("--base-url", default="https://uts-ws.nlm.nih.gov/rest")
+    parser.add_argument("--rate", type=float, default=20, help="requests per second (default 20)")
+    parser.add_argument("--burst", type=int, default=1)
+    parser.add_argument("--rate-limit-file", help="share the rate budget with other processes through this file")
+    parser.add_argument("--concurrency", type=int, default=64, help="requests in flight (default 64)")
+    parser.add_argument("--all-pages", action="store_true", help="follow pagination and emit every item per id")
+    parser.add_argument("--cache", help="SQLite response cache path")
+    parser.add_argument("--cache-ttl", type=float, default=86400)
+    parser.add_argument("--memory-cache", type=int, default=0, help="in-process LRU size")
+    parser.add_argument("--progress", nargs="?", type=float, const=1.0, default=0.0, metavar="SECONDS",
+                        help="report throughput on stderr every SECONDS (default 1)")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or $UMLS_API_KEY)")
+    kwargs = _parse_params(parser, args.method, args.params)
+    if args.all_pages:
+        if "all_pages" not in inspect.signature(getattr(UMLS, args.method)).parameters:
+            parser.error(f"{args.method} is not paged")
+        kwargs["all_pages"] = True
+
+    cache = ResponseCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+    umls = UMLS(args.api_key, requests_per_second=args.rate, burst=args.burst, rate_limit_file=args.rate_limit_file,
+                base_url=args.base_url, pool_maxsize=args.concurrency, max_workers=args.concurrency,
+                cache=cache, memory_cache_size=args.memory_cache)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    progress = _Progress(args.progress)
+    ids = _read_ids(args.inputs or ([] if args.ids else ["-"]), args.ids)
+    try:
+        with umls:
+            stream = getattr(umls.streaming(args.concurrency), args.method)(ids, **kwargs)
+            for id, result in stream:
+                if isinstance(result, BatchError):
+                    row = {"id": id, **result.to_json()}
+                else:
+                    row = {"id": id, "result": result}
+                out.write(json.dumps(row, separators=(",", ":")) + "\n")
+                progress.update(isinstance(result, BatchError))
+            out.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if cache is not None:
+            cache.close()
+        if args.progress:
+            progress.report("\n")
+    return 1 if progress.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import sqlite3
+from array import array
+from contextlib import closing
+
+
+class CrosswalkTable:
+    """Local lookup table of crosswalk mappings from one source vocabulary.
+
+    Every string (codes, target ids, names, source abbreviations) is
+    interned once in a shared pool; each code maps through a hash index to
+    an ``array('i')`` of ``(root_source, ui, name)`` string ids. A code is
+    *known* once its mappings (possibly none) have been fetched, so later
+    translations are dictionary lookups. With ``path`` the table is
+    persisted in SQLite and reloaded on the next run. ``errors`` holds the
+    failed lookups of the most recent ``UMLS.build_crosswalk`` call.
+    """
+
+    def __init__(self, source:str, target_sources:list[str] | tuple=(), version:str='current',
+                 path:str | None=None):
+        self.source = source
+        self.target_sources = tuple(sorted(target_sources))
+        self.version = version
+        self.path = path
+        self._strings = []
+        self._index = {}
+        self._mappings = {}
+        self._dirty = set()
+        self.errors = {}
+        if path is not None:
+            self._load()
+
+    def _intern(self, value:str) -> int:
+        i = self._index.get(value)
+        if i is None:
+            i = self._index[value] = len(self._strings)
+            self._strings.append(value)
+        return i
+
+    def __len__(self):
+        return len(self._mappings)
+
+    def __contains__(self, code:str):
+        i = self._index.get(code)
+        return i is not None and i in self._mappings
+
+    def missing(self, codes) -> list[str]:
+        """The codes in ``codes`` whose mappings have not been fetched yet."""
+        return [code for code in dict.fromkeys(codes) if code not in self]
+
+    def set_mappings(self, code:str, items:list[dict]):
+        """Record the complete list of crosswalk result items for ``code``."""
+        flat = array("i")
+        for item in items:
+            flat.extend((self._intern(item.get("rootSource") or ""), self._intern(item.get("ui") or ""),
+                         self._intern(item.get("name") or "")))
+        node = self._intern(code)
+        self._mappings[node] = flat
+        self._dirty.add(node)
+
+    def lookup(self, code:str) -> list[tuple[str, str, str]] | None:
+        """``[(root_source, ui, name), ...]`` for ``code``, or None if it was never fetched."""
+        flat = self._mappings.get(self._index.get(code))
+        if flat is None:
+            return None
+        strings = self._strings
+        return [(strings[flat[i]], strings[flat[i + 1]], strings[flat[i + 2]]) for i in range(0, len(flat), 3)]
+
+    def translate(self, codes, target_source:str | None=None) -> dict[str, list[str]]:
+        """``{code: [target ui, ...]}`` for every known code, optionally restricted to one target source."""
+        target = self._index.get(target_source) if target_source is not None else None
+        if target_source is not None and target is None:
+            return {code: [] for code in codes if code in self}
+        strings = self._strings
+        result = {}
+        for code in codes:
+            flat = self._mappings.get(self._index.get(code))
+            if flat is not None:
+                result[code] = [strings[flat[i + 1]] for i in range(0, len(flat), 3)
+                                if target is None or flat[i] == target]
+        return result
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS crosswalk ("
+            " source TEXT NOT NULL, version TEXT NOT NULL, targets TEXT NOT NULL, code TEXT NOT NULL,"
+            " mappings TEXT NOT NULL, PRIMARY KEY (source, version, targets, code))"
+        )
+        return conn
+
+    def _load(self):
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT code, mappings FROM crosswalk WHERE source = ? AND version = ? AND targets = ?",
+                (self.source, self.version, ",".join(self.target_sources)),
+            ).fetchall()
+        for code, mappings in rows:
+            fields = mappings.split("\t") if mappings else []
+            self.set_mappings(code, [{"rootSource": fields[i], "ui": fields[i + 1], "name": fields[i + 2]}
+                                     for i in range(0, len(fields), 3)])
+        self._dirty.clear()
+
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+        targets = ",".join(self.target_sources)
+        rows = [
+            (self.source, self.version, targets, self._strings[node],
+             "\t".join(self._strings[i] for i in self._mappings[node]))
+            for node in self._dirty
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO crosswalk VALUES (?, ?, ?, ?, ?)", rows)
+        self._dirty.clear()
@@ -0,0 +1,157 @@
+import json
+import os
+
+from .results import BatchError
+
+
+FORMATS = ("jsonl", "parquet")
+
+
+class BulkExportJob:
+    """Checkpointed, resumable export of one endpoint method over many ids.
+
+    Results are streamed through ``umls.streaming(window)`` and written to
+    append-only shards in ``output_dir`` (``part-00000.jsonl``, ... or
+    ``.parquet``), one ``{"id": ..., "result": ...}`` row per id. After each
+    flush the ids written are appended to ``completed.txt`` and the write
+    position is recorded in ``state.json``; re-running the same job after a
+    crash skips completed ids and discards anything written after the last
+    checkpoint, so every id ends up in the output exactly once. Ids repeated
+    in the input are exported once.
+
+    Failed lookups are logged to ``errors.jsonl`` and not checkpointed, so a
+    later run retries them. Parquet shards are written atomically, one file
+    per ``shard_size`` rows (requires pyarrow); JSONL shards are flushed
+    every ``flush_every`` rows. Works with the synchronous :class:`UMLS` client.
+    """
+
+    def __init__(self, umls, method:str, output_dir:str, format:str='jsonl', shard_size:int=100_000,
+                 flush_every:int=1000, window:int=64, **method_kwargs):
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}")
+        if not method.startswith(("retrieve_", "crosswalk_")) or not hasattr(umls, method):
+            raise ValueError(f"unknown endpoint method {method!r}")
+        self.umls = umls
+        self.method = method
+        self.output_dir = output_dir
+        self.format = format
+        self.shard_size = shard_size
+        self.flush_every = shard_size if format == "parquet" else min(flush_every, shard_size)
+        self.window = window
+        self.method_kwargs = method_kwargs
+        self._state_path = os.path.join(output_dir, "state.json")
+        self._checkpoint_path = os.path.join(output_dir, "completed.txt")
+        self._errors_path = os.path.join(output_dir, "errors.jsonl")
+
+    def _shard_path(self, shard:int) -> str:
+        return os.path.join(self.output_dir, f"part-{shard:05d}.{self.format}")
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self._state_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"shard": 0, "offset": 0, "rows": 0, "checkpoint_offset": 0}
+
+    def _save_state(self, state:dict):
+        tmp = self._state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._state_path)
+
+    def _recover(self, state:dict) -> set[str]:
+        # Drop anything written after the last checkpoint.
+        for name in os.listdir(self.output_dir):
+            if name.startswith("part-") and (name.endswith(".tmp") or int(name[5:10]) > state["shard"]):
+                os.remove(os.path.join(self.output_dir, name))
+        shard_path = self._shard_path(state["shard"])
+        if self.format == "jsonl" and os.path.exists(shard_path):
+            os.truncate(shard_path, state["offset"])
+        completed = set()
+        if os.path.exists(self._checkpoint_path):
+            os.truncate(self._checkpoint_path, state["checkpoint_offset"])
+            with open(self._checkpoint_path, encoding="utf-8") as f:
+                completed.update(line.rstrip("\n") for line in f)
+        return completed
+
+    def completed_ids(self) -> set[str]:
+        if not os.path.isdir(self.output_dir):
+            return set()
+        return self._recover(self._load_state())
+
+    @staticmethod
+    def _pending(ids, seen:set[str]):
+        # Each id is queued at most once per run, however often it appears in ``ids``;
+        # the streaming view skips blank lines.
+        for id in ids:
+            id = id.rstrip("\r\n")
+            if id not in seen:
+                seen.add(id)
+                yield id
+
+    def run(self, ids) -> dict:
+        """Export every id in ``ids`` (any iterable) not already completed; returns counts for this run."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = self._load_state()
+        completed = self._recover(state)
+        pending = self._pending(ids, completed)
+
+        counts = {"written": 0, "failed": 0, "skipped_before": len(completed)}
+        buffer = []
+        stream = getattr(self.umls.streaming(self.window), self.method)(pending, **self.method_kwargs)
+        with open(self._errors_path, "a", encoding="utf-8") as errors:
+            for id, result in stream:
+                if isinstance(result, BatchError):
+                    errors.write(json.dumps({"id": id, **result.to_json()}) + "\n")
+                    counts["failed"] += 1
+                    continue
+                buffer.append((id, result))
+                if len(buffer) >= min(self.flush_every, self.shard_size - state["rows"]):
+                    state = self._flush(buffer, state)
+                    counts["written"] += len(buffer)
+                    buffer = []
+            if buffer:
+                state = self._flush(buffer, state)
+                counts["written"] += len(buffer)
+        return counts
+
+    def _flush(self, rows:list, state:dict) -> dict:
+        if self.format == "jsonl":
+            with open(self._shard_path(state["shard"]), "ab") as f:
+                for id, result in rows:
+                    f.write(json.dumps({"id": id, "result": result}, separators=(",", ":")).encode("utf-8") + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+                offset = f.tell()
+        else:
+            self._write_parquet(rows, state["shard"])
+            offset = 0
+
+        with open(self._checkpoint_path, "a", encoding="utf-8") as f:
+            f.write("".join(id + "\n" for id, _ in rows))
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint_offset = f.tell()
+
+        shard, count = state["shard"], state["rows"] + len(rows)
+        if count >= self.shard_size or self.format == "parquet":
+            shard, offset, count = shard + 1, 0, 0
+        state = {"shard": shard, "offset": offset, "rows": count, "checkpoint_offset": checkpoint_offset}
+        self._save_state(state)
+        return state
+
+    def _write_parquet(self, rows:list, shard:int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("parquet export requires pyarrow: pip install 'umls_api_client[parquet]'") from e
+        table = pa.table({
+            "id": [id for id, _ in rows],
+            "result": [json.dumps(result, separators=(",", ":")) for _, result in rows],
+        })
+        path = self._shard_path(shard)
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
@@ -0,0 +1,123 @@
+import sqlite3
+from array import array
+from contextlib import closing
+
+
+DIRECTIONS = ("children", "parents")
+
+
+class HierarchyGraph:
+    """Local adjacency index of one source vocabulary's hierarchy.
+
+    Codes are interned to integers and each node's neighbours are kept as a
+    compact ``array('i')`` per direction. A node is *expanded* in a
+    direction once its full neighbour list has been fetched; closure, depth
+    and LCA queries are then answered from memory. With ``path`` the edges
+    are persisted in SQLite and reloaded on the next run.
+    """
+
+    def __init__(self, source:str, version:str='current', path:str | None=None):
+        self.source = source
+        self.version = version
+        self.path = path
+        self._ids = []
+        self._index = {}
+        self._edges = {"children": {}, "parents": {}}
+        self._expanded = {"children": set(), "parents": set()}
+        self._dirty = set()
+        if path is not None:
+            self._load()
+
+    def _intern(self, code:str) -> int:
+        node = self._index.get(code)
+        if node is None:
+            node = self._index[code] = len(self._ids)
+            self._ids.append(code)
+        return node
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, code:str):
+        return code in self._index
+
+    def is_expanded(self, code:str, direction:str) -> bool:
+        node = self._index.get(code)
+        return node is not None and node in self._expanded[direction]
+
+    def set_neighbours(self, code:str, neighbours:list[str], direction:str):
+        """Record the complete neighbour list of ``code`` in ``direction``; the reverse edges are added too."""
+        reverse = "parents" if direction == "children" else "children"
+        node = self._intern(code)
+        targets = array("i", dict.fromkeys(self._intern(n) for n in neighbours))
+        self._edges[direction][node] = targets
+        self._expanded[direction].add(node)
+        for target in targets:
+            back = self._edges[reverse].setdefault(target, array("i"))
+            if node not in back:
+                back.append(node)
+        self._dirty.add((node, direction))
+
+    def neighbours(self, code:str, direction:str) -> list[str]:
+        node = self._index.get(code)
+        if node is None:
+            return []
+        return [self._ids[n] for n in self._edges[direction].get(node, ())]
+
+    def closure(self, code:str, direction:str='children', max_depth:int | None=None) -> dict[str, int]:
+        """Every node reachable from ``code`` in ``direction`` with its shortest depth (``code`` itself excluded)."""
+        start = self._index.get(code)
+        if start is None:
+            return {}
+        edges = self._edges[direction]
+        depths = {start: 0}
+        frontier = [start]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for target in edges.get(node, ()):
+                    if target not in depths:
+                        depths[target] = depth
+                        next_frontier.append(target)
+            frontier = next_frontier
+        del depths[start]
+        return {self._ids[n]: d for n, d in depths.items()}
+
+    def depth(self, code:str, ancestor:str) -> int | None:
+        return self.closure(code, "parents").get(ancestor)
+
+    def lowest_common_ancestors(self, a:str, b:str) -> list[str]:
+        common = (set(self.closure(a, "parents")) | {a}) & (set(self.closure(b, "parents")) | {b})
+        return [code for code in common if not any(child in common for child in self.neighbours(code, "children"))]
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS hierarchy ("
+            " source TEXT NOT NULL, version TEXT NOT NULL, node TEXT NOT NULL, direction TEXT NOT NULL,"
+            " neighbours TEXT NOT NULL, PRIMARY KEY (source, version, node, direction))"
+        )
+        return conn
+
+    def _load(self):
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT node, direction, neighbours FROM hierarchy WHERE source = ? AND version = ?",
+                (self.source, self.version),
+            ).fetchall()
+        for code, direction, neighbours in rows:
+            self.set_neighbours(code, neighbours.split("\t") if neighbours else [], direction)
+        self._dirty.clear()
+
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+        rows = [
+            (self.source, self.version, self._ids[node], direction, "\t".join(self.neighbours(self._ids[node], direction)))
+            for node, direction in self._dirty
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO hierarchy VALUES (?, ?, ?, ?, ?)", rows)
+        self._dirty.clear()
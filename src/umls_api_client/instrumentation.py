@@ -0,0 +1,140 @@
+import bisect
+import threading
+from urllib.parse import urlsplit
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def endpoint_label(url:str, base_url:str) -> str:
+    """Low-cardinality name of the endpoint a URL belongs to, e.g.
+    ``/content/{version}/CUI/{id}/atoms`` or ``/content/{version}/source/MSH/{id}/parents``."""
+    path = url[len(base_url):] if url.startswith(base_url) else urlsplit(url).path
+    parts = path.strip("/").split("/")
+    if len(parts) > 1:
+        parts[1] = "{version}"
+    if len(parts) > 3 and parts[2] in ("CUI", "TUI"):
+        parts[3] = "{id}"
+    elif len(parts) > 4 and parts[2] == "source":
+        parts[4] = "{id}"
+    return "/" + "/".join(parts)
+
+
+class Instrumentation:
+    """Hooks called on the client's hot path; every method is a no-op here.
+
+    Subclass and override what you need (e.g. to feed Prometheus or
+    OpenTelemetry instruments), then pass an instance as
+    ``UMLS(..., instrumentation=...)``. Hooks run on the requesting thread
+    and should be cheap.
+    """
+
+    def on_queue_wait(self, seconds:float):
+        """Time a task waited for a free worker thread."""
+
+    def on_rate_limit_wait(self, endpoint:str, seconds:float):
+        """Time a request slept in the rate limiter before being sent."""
+
+    def on_request(self, endpoint:str, status:int | None, seconds:float, nbytes:int):
+        """One HTTP attempt finished; ``status`` is None for connection errors and timeouts."""
+
+    def on_retry(self, endpoint:str, attempt:int, delay:float, status:int | None):
+        """An attempt failed and will be retried after ``delay`` seconds."""
+
+    def on_cache(self, layer:str, hit:bool):
+        """A lookup in the ``"memory"`` or ``"disk"`` cache."""
+
+    def on_inflight(self, count:int):
+        """Number of HTTP requests currently on the wire changed."""
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "statuses", "bucket_counts", "latency_sum", "bytes", "rate_limit_wait", "retries")
+
+    def __init__(self, buckets:tuple):
+        self.requests = 0
+        self.statuses = {}
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.latency_sum = 0.0
+        self.bytes = 0
+        self.rate_limit_wait = 0.0
+        self.retries = 0
+
+
+class MetricsRecorder(Instrumentation):
+    """Thread-safe in-memory aggregation of every hook, readable with :meth:`snapshot`.
+
+    Latencies go into cumulative-style histogram buckets (upper bounds in
+    seconds), so the snapshot maps directly onto a Prometheus histogram.
+    """
+
+    def __init__(self, buckets:tuple[float, ...]=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._cache = {}
+        self.queue_wait = 0.0
+        self.inflight = 0
+        self.max_inflight = 0
+
+    def _stats(self, endpoint:str) -> _EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = _EndpointStats(self.buckets)
+        return stats
+
+    def on_queue_wait(self, seconds:float):
+        with self._lock:
+            self.queue_wait += seconds
+
+    def on_rate_limit_wait(self, endpoint:str, seconds:float):
+        with self._lock:
+            self._stats(endpoint).rate_limit_wait += seconds
+
+    def on_request(self, endpoint:str, status:int | None, seconds:float, nbytes:int):
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.requests += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            stats.latency_sum += seconds
+            stats.bytes += nbytes
+
+    def on_retry(self, endpoint:str, attempt:int, delay:float, status:int | None):
+        with self._lock:
+            self._stats(endpoint).retries += 1
+
+    def on_cache(self, layer:str, hit:bool):
+        with self._lock:
+            counts = self._cache.setdefault(layer, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def on_inflight(self, count:int):
+        with self._lock:
+            self.inflight = count
+            self.max_inflight = max(self.max_inflight, count)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in self._endpoints.items():
+                cumulative, histogram = 0, {}
+                for bound, count in zip(self.buckets + (float("inf"),), stats.bucket_counts):
+                    cumulative += count
+                    histogram[bound] = cumulative
+                endpoints[endpoint] = {
+                    "requests": stats.requests,
+                    "statuses": dict(stats.statuses),
+                    "latency_buckets": histogram,
+                    "latency_sum": stats.latency_sum,
+                    "bytes": stats.bytes,
+                    "rate_limit_wait": stats.rate_limit_wait,
+                    "retries": stats.retries,
+                }
+            return {
+                "endpoints": endpoints,
+                "cache": {layer: dict(counts) for layer, counts in self._cache.items()},
+                "queue_wait": self.queue_wait,
+                "inflight": self.inflight,
+                "max_inflight": self.max_inflight,
+            }
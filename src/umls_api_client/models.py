@@ -0,0 +1,176 @@
+import sys
+from array import array
+
+
+def _interned(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _tail(uri):
+    # UTS returns related ids as URIs; keep only the id itself.
+    return uri.rsplit("/", 1)[-1] if isinstance(uri, str) else uri
+
+
+class _Record:
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Atom(_Record):
+    __slots__ = ("ui", "name", "term_type", "language", "root_source", "code", "concept", "obsolete", "suppressible")
+
+    @classmethod
+    def from_json(cls, item:dict) -> "Atom":
+        return cls(item.get("ui"), item.get("name"), _interned(item.get("termType")), _interned(item.get("language")),
+                   _interned(item.get("rootSource")), _tail(item.get("code")), _tail(item.get("concept")),
+                   item.get("obsolete"), item.get("suppressible"))
+
+
+class Relation(_Record):
+    __slots__ = ("ui", "label", "additional_label", "root_source", "related_id", "related_name", "obsolete", "suppressible")
+
+    @classmethod
+    def from_json(cls, item:dict) -> "Relation":
+        return cls(item.get("ui"), _interned(item.get("relationLabel")), _interned(item.get("additionalRelationLabel")),
+                   _interned(item.get("rootSource")), _tail(item.get("relatedId")), item.get("relatedIdName"),
+                   item.get("obsolete"), item.get("suppressible"))
+
+
+class Concept(_Record):
+    __slots__ = ("ui", "name", "root_source", "semantic_types", "atom_count", "obsolete", "suppressible")
+
+    @classmethod
+    def from_json(cls, item:dict) -> "Concept":
+        semantic_types = tuple(_interned(t.get("name")) for t in item.get("semanticTypes") or ())
+        return cls(item.get("ui"), item.get("name"), _interned(item.get("rootSource")), semantic_types,
+                   item.get("atomCount"), item.get("obsolete"), item.get("suppressible"))
+
+
+class Definition(_Record):
+    __slots__ = ("value", "root_source", "source_originated")
+
+    @classmethod
+    def from_json(cls, item:dict) -> "Definition":
+        return cls(item.get("value"), _interned(item.get("rootSource")), item.get("sourceOriginated"))
+
+
+class SearchHit(_Record):
+    __slots__ = ("ui", "name", "root_source")
+
+    @classmethod
+    def from_json(cls, item:dict) -> "SearchHit":
+        return cls(item.get("ui"), item.get("name"), _interned(item.get("rootSource")))
+
+
+_CLASS_TYPES = {
+    "Atom": Atom,
+    "Concept": Concept,
+    "SourceAtomCluster": Concept,
+    "Definition": Definition,
+    "ConceptRelation": Relation,
+    "AtomClusterRelation": Relation,
+    "AtomRelation": Relation,
+}
+
+
+def parse_item(item):
+    """Turn one result item into its record type, picked by ``classType``.
+    Items of other types are returned unchanged."""
+    if not isinstance(item, dict):
+        return item
+    model = _CLASS_TYPES.get(item.get("classType"))
+    if model is None:
+        if "ui" in item and "rootSource" in item and len(item) <= 4:
+            return SearchHit.from_json(item)
+        return item
+    return model.from_json(item)
+
+
+class Page:
+    """One response page. Records are only built from the raw JSON when first accessed."""
+
+    __slots__ = ("page_number", "page_size", "page_count", "_raw", "_records")
+
+    def __init__(self, payload:dict):
+        self.page_number = payload.get("pageNumber")
+        self.page_size = payload.get("pageSize")
+        self.page_count = payload.get("pageCount")
+        self._raw = payload.get("result")
+        self._records = None
+
+    @property
+    def records(self) -> list:
+        if self._records is None:
+            raw = self._raw
+            if isinstance(raw, dict) and "results" in raw:
+                raw = [item for item in raw["results"] if item.get("ui") != "NONE"]
+            elif not isinstance(raw, list):
+                raw = [raw]
+            self._records = [parse_item(item) for item in raw]
+            self._raw = None
+        return self._records
+
+    @property
+    def record(self):
+        """The single record of an endpoint that returns one object (e.g. ``retrieve_cui_info``)."""
+        return self.records[0] if self.records else None
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+    def to_columns(self) -> dict:
+        return to_columns(self.records)
+
+    def __repr__(self):
+        return f"Page(page_number={self.page_number}, page_count={self.page_count}, records={len(self)})"
+
+
+def parse(payload):
+    """Typed view of a response: a :class:`Page` for a response payload, a list
+    of records for a list of items (e.g. from ``all_pages=True``)."""
+    if isinstance(payload, list):
+        return [parse_item(item) for item in payload]
+    if isinstance(payload, dict) and "result" in payload:
+        return Page(payload)
+    return parse_item(payload)
+
+
+def to_columns(records:list) -> dict:
+    """Columnar form of same-typed records: ``{field: column}``.
+
+    Integer and boolean fields become ``array`` columns (usable with
+    ``numpy.frombuffer``); the rest are lists, so the result can be passed
+    straight to ``pyarrow.table`` or ``pandas.DataFrame``.
+    """
+    records = [r for r in records if isinstance(r, _Record)]
+    if not records:
+        return {}
+    columns = {}
+    for name in type(records[0]).__slots__:
+        values = [getattr(r, name) for r in records]
+        if all(isinstance(v, bool) for v in values):
+            columns[name] = array("b", values)
+        elif all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+            columns[name] = array("q", values)
+        else:
+            columns[name] = values
+    return columns
@@ -0,0 +1,43 @@
+import re
+import unicodedata
+
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+
+
+# Words that look plural but are not, or whose singular is a different term.
+_INVARIANT = frozenset({
+    "aids", "biceps", "caries", "chills", "cramps", "forceps", "hives", "lens", "means", "measles", "mumps",
+    "news", "pants", "rabies", "rickets", "scabies", "series", "shingles", "species", "stairs", "thanks", "triceps",
+})
+
+
+def _singular(token:str) -> str:
+    # A conservative S-stemmer: only regular plurals of longer lower-case words
+    # are reduced, so acronyms (AIDS), short tokens (lens, news) and words
+    # ending in -es/-is/-us/-ss/-ics (diabetes, sepsis, virus, genetics) keep
+    # their form.
+    lowered = token.casefold()
+    if (len(token) <= 4 or not token.isalpha() or token.isupper() or lowered in _INVARIANT
+            or (lowered.endswith(("es", "is", "us", "ss", "ics")) and not lowered.endswith("ies"))):
+        return lowered
+    if lowered.endswith("ies"):
+        return lowered[:-3] + "y"
+    if lowered.endswith("s"):
+        return lowered[:-1]
+    return lowered
+
+
+def canonicalize(text:str) -> str:
+    """Collapse surface variants of a mention: Unicode form, case, punctuation,
+    whitespace and regular English plurals."""
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(_singular(token) for token in _PUNCTUATION_RE.sub(" ", text).split())
+
+
+def group_mentions(mentions) -> dict[str, list[str]]:
+    """Group distinct mentions by canonical form, keeping first-seen order."""
+    groups = {}
+    for mention in mentions:
+        groups.setdefault(canonicalize(mention), {})[mention] = None
+    return {canonical: list(group) for canonical, group in groups.items()}
@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import os
+import struct
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process sharing
+    fcntl = None
+
+
+_STATE = struct.Struct("d")
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every request a client makes.
+
+    Implemented as a GCRA: instead of counting tokens it tracks the
+    theoretical arrival time of the next request, so each caller can be
+    told exactly how long to sleep rather than waiting out a whole period.
+    Passing ``shared_path`` keeps that state in a small lock file so
+    several processes on one host draw from the same budget.
+
+    When the server pushes back, :meth:`throttle` halves the rate (down to
+    ``min_rate``) and can pause every caller; :meth:`recover` then climbs
+    back towards the configured rate one success at a time.
+
+    Callers that pass a ``priority`` to :meth:`acquire` queue for tokens
+    instead of reserving future slots: whenever a token comes due it goes
+    to the most urgent waiter (lowest priority value, then arrival), so
+    urgent requests are not stuck behind slots already promised to bulk work.
+    """
+
+    def __init__(self, rate:float, burst:int=1, shared_path:str | None=None, min_rate:float | None=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = float(rate)
+        self.max_rate = self.rate
+        self.min_rate = float(min_rate) if min_rate is not None else self.rate / 10
+        self.burst = int(burst)
+        self._lock = threading.Lock()
+        self._tat = 0.0
+        self._last_throttle = float("-inf")
+        self._gate = threading.Lock()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._fd = None
+        if shared_path is not None:
+            if fcntl is None:
+                raise RuntimeError("shared_path requires fcntl, which is not available on this platform")
+            self._fd = os.open(shared_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.rate
+
+    def _advance(self, tat:float, now:float, tokens:int) -> tuple[float, float]:
+        tolerance = (self.burst - 1) * self.interval
+        tat = max(tat, now)
+        wait = max(0.0, tat - tolerance - now)
+        return wait, tat + tokens * self.interval
+
+    def _update(self, step):
+        # Apply step(tat, now) -> (result, new_tat) to the local or shared state. Caller holds self._lock.
+        if self._fd is None:
+            result, self._tat = step(self._tat, time.monotonic())
+            return result
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            raw = os.pread(self._fd, _STATE.size, 0)
+            tat = _STATE.unpack(raw)[0] if len(raw) == _STATE.size else 0.0
+            result, tat = step(tat, time.time())
+            os.pwrite(self._fd, _STATE.pack(tat), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return result
+
+    def reserve(self, tokens:int=1) -> float:
+        """Claim ``tokens`` and return the number of seconds to wait before using them."""
+        with self._lock:
+            return self._update(lambda tat, now: self._advance(tat, now, tokens))
+
+    def _peek(self, tokens:int) -> float:
+        # Seconds until ``tokens`` could be reserved, without claiming them.
+        with self._lock:
+            return self._update(lambda tat, now: (self._advance(tat, now, tokens)[0], tat))
+
+    def _reserve_in_turn(self, priority:int, tokens:int) -> float:
+        # Wait until this caller is the most urgent waiter and its tokens are due, then claim them.
+        # Each waiter sleeps on its own condition so only the new head is woken when the head leaves.
+        entry = (priority, next(self._seq), threading.Condition(self._gate))
+        with self._gate:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    wait = self._peek(tokens) if self._waiters[0] is entry else None
+                    if wait is not None and wait <= 0:
+                        return self.reserve(tokens)
+                    entry[2].wait(wait)
+            finally:
+                was_head = self._waiters[0] is entry
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                if was_head and self._waiters:
+                    self._waiters[0][2].notify()
+
+    def throttle(self, pause:float=0.0):
+        """Slow down after a 429/503; nobody is let through for the next ``pause`` seconds."""
+        with self._lock:
+            # A burst of concurrent 429s is one signal, not many: halve at most once a second.
+            now = time.monotonic()
+            if now - self._last_throttle >= 1.0:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_throttle = now
+            if pause > 0:
+                self._update(lambda tat, now: (None, max(tat, now + pause)))
+
+    def recover(self):
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def acquire(self, tokens:int=1, priority:int | None=None) -> float:
+        """Block until ``tokens`` are available. Returns the time spent waiting."""
+        if priority is not None:
+            start = time.monotonic()
+            wait = self._reserve_in_turn(priority, tokens)
+            if wait > 0:  # another process sharing the bucket got there first
+                time.sleep(wait)
+            return time.monotonic() - start
+        wait = self.reserve(tokens)
+        if wait > 0:
+            deadline = time.monotonic() + wait
+            remaining = wait
+            while remaining > 0:
+                time.sleep(remaining)
+                remaining = deadline - time.monotonic()
+        return wait
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,86 @@
+import inspect
+import re
+
+
+# The API key travels as a query parameter, so it shows up in request URLs and error messages.
+_API_KEY_RE = re.compile(r"(apiKey=)[^&#\s'\"]*")
+
+
+def redact(text:str) -> str:
+    """``text`` with the value of every ``apiKey=`` query parameter masked."""
+    return _API_KEY_RE.sub(r"\1***", text)
+
+
+class BatchError:
+    __slots__ = ("exception", "status_code")
+
+    def __init__(self, exception:BaseException):
+        self.exception = exception
+        self.status_code = _status_code(exception)
+
+    def __repr__(self):
+        return f"BatchError(status_code={self.status_code!r}, exception={self.exception!r})"
+
+    def to_json(self) -> dict:
+        """JSON-safe summary for logs and output files, with the API key masked."""
+        return {"error": type(self.exception).__name__, "status_code": self.status_code,
+                "message": redact(str(self.exception))}
+
+
+def _status_code(exception:BaseException) -> int | None:
+    response = getattr(exception, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(exception, "status", None)  # aiohttp.ClientResponseError
+    return status
+
+
+class BatchResult(dict):
+    """Results of a batch call: successful lookups as a regular ``{id: response}``
+    dict, and failed ones in ``errors`` as ``{id: BatchError}``.
+
+    One failing id no longer discards the rest of the batch; call
+    :meth:`retry_failed` to resubmit just the failures, or
+    :meth:`raise_for_errors` to get the old all-or-nothing behaviour.
+    """
+
+    def __init__(self, resubmit=None):
+        super().__init__()
+        self.errors = {}
+        self._resubmit = resubmit
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def failed_ids(self) -> list:
+        return list(self.errors)
+
+    def raise_for_errors(self):
+        if self.errors:
+            raise next(iter(self.errors.values())).exception
+
+    def retry_failed(self):
+        """Resubmit only the failed ids and return a new, merged BatchResult.
+
+        On an async client this returns an awaitable.
+        """
+        if self._resubmit is None:
+            raise RuntimeError("this BatchResult cannot be resubmitted")
+        resubmitted = self._resubmit(self.failed_ids)
+        if inspect.isawaitable(resubmitted):
+            async def merge():
+                return self._merge(await resubmitted)
+            return merge()
+        return self._merge(resubmitted)
+
+    def _merge(self, resubmitted:"BatchResult") -> "BatchResult":
+        merged = BatchResult(self._resubmit)
+        merged.update(self)
+        merged.update(resubmitted)
+        merged.errors = dict(resubmitted.errors)
+        return merged
+
+    def __repr__(self):
+        return f"BatchResult({dict.__repr__(self)}, errors={self.errors!r})"
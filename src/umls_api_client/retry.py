@@ -0,0 +1,54 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class RetryPolicy:
+    """When and how long to wait before re-sending a failed request.
+
+    Delays grow as ``backoff_factor * 2 ** attempt`` up to ``max_backoff``
+    with full jitter. A ``Retry-After`` header from the server takes
+    precedence over the computed delay. ``max_retries=0`` disables retries.
+    """
+
+    def __init__(self, max_retries:int=5, backoff_factor:float=0.5, max_backoff:float=60.0, jitter:bool=True,
+                 statuses:frozenset[int]=RETRY_STATUSES, retry_connection_errors:bool=True):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.retry_connection_errors = retry_connection_errors
+
+    def should_retry(self, attempt:int, status:int | None=None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if status is None:
+            return self.retry_connection_errors
+        return status in self.statuses
+
+    def delay(self, attempt:int, retry_after:str | None=None) -> float:
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_backoff)
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+
+def parse_retry_after(value:str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,365 @@
+import bisect
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import re
+from array import array
+from urllib.parse import urlsplit
+
+import requests
+
+
+# Every index is one sorted array('Q') of (key << 40) | byte offset into an RRF file,
+# so a lookup is a bisect over a memory-mapped file and a few line reads.
+_OFFSET_BITS = 40
+_OFFSET_MASK = (1 << _OFFSET_BITS) - 1
+_KEY_BITS = 24
+# Index entries are sorted in runs of this many and then merged, so no
+# more than one run is ever expanded into a Python list.
+_SORT_CHUNK = 1 << 20
+
+_FILES = {
+    "conso": "MRCONSO.RRF",
+    "def": "MRDEF.RRF",
+    "rel": "MRREL.RRF",
+    "sty": "MRSTY.RRF",
+}
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]|_")
+
+
+def normalize_string(text:str) -> str:
+    """Approximation of UTS normalizedString matching: case, punctuation,
+    possessives and word order are ignored."""
+    text = text.casefold().replace("'s ", " ")
+    if text.endswith("'s"):
+        text = text[:-2]
+    return " ".join(sorted(_PUNCTUATION_RE.sub(" ", text).split()))
+
+
+def _string_key(text:str) -> int:
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") >> (32 - _KEY_BITS)
+
+
+def _cui_key(cui:str) -> int:
+    return int(cui[1:])
+
+
+def _index_file(index_dir:str, name:str) -> str:
+    return os.path.join(index_dir, f"{name}.idx")
+
+
+def _sorted_run(values:array) -> array:
+    return array("Q", sorted(values))
+
+
+def _write_merged(runs:list[array], path:str):
+    with open(path, "wb") as out:
+        if len(runs) == 1:
+            runs[0].tofile(out)
+            return
+        buffer = array("Q")
+        for value in heapq.merge(*runs):
+            buffer.append(value)
+            if len(buffer) >= _SORT_CHUNK:
+                buffer.tofile(out)
+                del buffer[:]
+        buffer.tofile(out)
+
+
+def build_index(rrf_dir:str, index_dir:str, release:str | None=None):
+    """One-time build of the offset indexes for the RRF files in ``rrf_dir``.
+
+    MRCONSO.RRF is required; MRDEF, MRREL and MRSTY are indexed when present.
+    The RRF files are not copied: ``index_dir`` only records where they are.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    indexed = {}
+    for name, filename in _FILES.items():
+        path = os.path.join(rrf_dir, filename)
+        if not os.path.exists(path):
+            if name == "conso":
+                raise FileNotFoundError(path)
+            continue
+        entries = {name: array("Q")}
+        if name == "conso":
+            entries["exact"] = array("Q")
+            entries["norm"] = array("Q")
+        runs = {index_name: [] for index_name in entries}
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                fields = line.split(b"|", 15)
+                entries[name].append((_cui_key(fields[0].decode("ascii")) << _OFFSET_BITS) | offset)
+                if name == "conso":
+                    text = fields[14].decode("utf-8")
+                    entries["exact"].append((_string_key(text.casefold()) << _OFFSET_BITS) | offset)
+                    entries["norm"].append((_string_key(normalize_string(text)) << _OFFSET_BITS) | offset)
+                offset += len(line)
+                if len(entries[name]) >= _SORT_CHUNK:
+                    for index_name, values in entries.items():
+                        runs[index_name].append(_sorted_run(values))
+                        entries[index_name] = array("Q")
+        for index_name, values in entries.items():
+            runs[index_name].append(_sorted_run(values))
+            _write_merged(runs.pop(index_name), _index_file(index_dir, index_name))
+        indexed[name] = os.path.abspath(path)
+
+    with open(os.path.join(index_dir, "meta.json"), "w") as f:
+        json.dump({"release": release, "files": indexed}, f)
+
+
+def _http_error(url:str, status:int, reason:str) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.url = url
+    return requests.HTTPError(f"{status} {reason} for url: {url}", response=response)
+
+
+def _flag(params:dict, name:str, default:bool) -> bool:
+    value = params.get(name)
+    if value is None:
+        return default
+    return str(value).lower() == "true"
+
+
+def _csv(params:dict, name:str) -> set[str] | None:
+    value = params.get(name)
+    return set(value.split(",")) if value else None
+
+
+def _page(items:list, params:dict) -> dict:
+    page_number = int(params.get("pageNumber", 1))
+    page_size = int(params.get("pageSize", 25))
+    start = (page_number - 1) * page_size
+    return {
+        "pageSize": page_size,
+        "pageNumber": page_number,
+        "pageCount": max(1, -(-len(items) // page_size)),
+        "result": items[start:start + page_size],
+    }
+
+
+class RRFBackend:
+    """Serves the concept endpoints of :class:`UMLS` from a local Metathesaurus release.
+
+    Build the index once with :func:`build_index`, then pass
+    ``backend=RRFBackend(index_dir)`` to ``UMLS``. Supported:
+    ``retrieve_cui_info``, ``retrieve_cui_atoms``, ``retrieve_cui_definitions``,
+    ``retrieve_cui_relations`` and ``retrieve_cuis`` with
+    ``searchType='exact'`` or ``'normalizedString'``. Responses have the
+    same JSON shape as the REST API; unknown concepts raise a 404
+    ``HTTPError`` and unsupported endpoints a 501.
+    """
+
+    def __init__(self, index_dir:str):
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            meta = json.load(f)
+        self.release = meta["release"]
+        self._maps = []
+        self._data = {}
+        for name, path in meta["files"].items():
+            self._data[name] = self._map(path)
+        self._index = {}
+        for name in list(meta["files"]) + ["exact", "norm"]:
+            mapped = self._map(_index_file(index_dir, name))
+            self._index[name] = memoryview(mapped).cast("Q") if len(mapped) else ()
+
+    def _map(self, path:str):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def close(self):
+        for view in self._index.values():
+            if isinstance(view, memoryview):
+                view.release()
+        self._index.clear()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+    def _lines(self, name:str, key:int, index:str | None=None) -> list[list[str]]:
+        values = self._index.get(index or name, ())
+        data = self._data.get(name, b"")
+        start = bisect.bisect_left(values, key << _OFFSET_BITS)
+        stop = bisect.bisect_left(values, (key + 1) << _OFFSET_BITS)
+        rows = []
+        for i in range(start, stop):
+            offset = values[i] & _OFFSET_MASK
+            end = data.find(b"\n", offset)
+            rows.append(data[offset:end if end != -1 else len(data)].decode("utf-8").rstrip("\r").split("|"))
+        return rows
+
+    def _atoms(self, cui:str) -> list[list[str]]:
+        return self._lines("conso", _cui_key(cui))
+
+    def _preferred_name(self, atoms:list[list[str]]) -> str | None:
+        # MRCONSO: CUI|LAT|TS|LUI|STT|SUI|ISPREF|AUI|SAUI|SCUI|SDUI|SAB|TTY|CODE|STR|SRL|SUPPRESS|CVF
+        for atom in atoms:
+            if atom[1] == "ENG" and atom[2] == "P" and atom[4] == "PF" and atom[6] == "Y":
+                return atom[14]
+        return atoms[0][14] if atoms else None
+
+    def _atom_json(self, atom:list[str]) -> dict:
+        return {
+            "classType": "Atom",
+            "ui": atom[7],
+            "name": atom[14],
+            "termType": atom[12],
+            "language": atom[1],
+            "rootSource": atom[11],
+            "code": atom[13],
+            "sourceConcept": atom[9] or None,
+            "sourceDescriptor": atom[10] or None,
+            "concept": atom[0],
+            "obsolete": atom[16] == "O",
+            "suppressible": atom[16] in ("O", "E", "Y"),
+        }
+
+    def get(self, url:str, params:dict):
+        parts = urlsplit(url).path.split("/")
+        try:
+            i = parts.index("content")
+        except ValueError:
+            i = None
+        if i is not None and len(parts) > i + 3 and parts[i + 2] == "CUI":
+            cui = parts[i + 3]
+            tail = parts[i + 4:]
+            atoms = self._atoms(cui) if re.fullmatch(r"C\d+", cui) else []
+            if not atoms:
+                raise _http_error(url, 404, "Not Found")
+            if not tail:
+                return {"pageSize": 25, "pageNumber": 1, "pageCount": 1, "result": self._concept(cui, atoms)}
+            if tail[0] == "atoms":
+                return self._concept_atoms(url, atoms, params, preferred=tail[1:] == ["preferred"])
+            if tail == ["definitions"]:
+                return self._definitions(url, cui, params)
+            if tail == ["relations"]:
+                return self._relations(url, cui, params)
+        elif "search" in parts:
+            return self._search(url, params)
+        raise _http_error(url, 501, "Not Implemented by RRFBackend")
+
+    def _concept(self, cui:str, atoms:list[list[str]]) -> dict:
+        # MRSTY: CUI|TUI|STN|STY|ATUI|CVF
+        semantic_types = [{"name": sty[3], "tui": sty[1]} for sty in self._lines("sty", _cui_key(cui))]
+        return {
+            "classType": "Concept",
+            "ui": cui,
+            "name": self._preferred_name(atoms),
+            "semanticTypes": semantic_types,
+            "atomCount": len(atoms),
+            "suppressible": all(atom[16] != "N" for atom in atoms),
+            "rootSource": "MTH",
+        }
+
+    def _concept_atoms(self, url:str, atoms:list[list[str]], params:dict, preferred:bool) -> dict:
+        sabs = _csv(params, "sabs")
+        ttys = _csv(params, "ttys")
+        language = params.get("language")
+        include_obsolete = _flag(params, "includeObsolete", True)
+        include_suppressible = _flag(params, "includeSuppressible", True)
+        selected = [
+            atom for atom in atoms
+            if (sabs is None or atom[11] in sabs)
+            and (ttys is None or atom[12] in ttys)
+            and (not language or atom[1] == language)
+            and (include_obsolete or atom[16] != "O")
+            and (include_suppressible or atom[16] not in ("E", "Y"))
+        ]
+        if preferred:
+            name = self._preferred_name(selected)
+            match = next((atom for atom in selected if atom[14] == name), None)
+            if match is None:
+                raise _http_error(url, 404, "Not Found")
+            return {"pageSize": 1, "pageNumber": 1, "pageCount": 1, "result": self._atom_json(match)}
+        return _page([self._atom_json(atom) for atom in selected], params)
+
+    def _definitions(self, url:str, cui:str, params:dict) -> dict:
+        # MRDEF: CUI|AUI|ATUI|SATUI|SAB|DEF|SUPPRESS|CVF
+        sabs = _csv(params, "sabs")
+        definitions = [
+            {"classType": "Definition", "value": row[5], "rootSource": row[4], "sourceOriginated": True}
+            for row in self._lines("def", _cui_key(cui))
+            if sabs is None or row[4] in sabs
+        ]
+        if not definitions:
+            raise _http_error(url, 404, "Not Found")
+        return _page(definitions, params)
+
+    def _relations(self, url:str, cui:str, params:dict) -> dict:
+        # MRREL: CUI1|AUI1|STYPE1|REL|CUI2|AUI2|STYPE2|RELA|RUI|SRUI|SAB|SL|RG|DIR|SUPPRESS|CVF
+        sabs = _csv(params, "sabs")
+        labels = _csv(params, "includeRelationLabels")
+        additional = _csv(params, "includeAdditionalRelationLabels")
+        include_obsolete = _flag(params, "includeObsolete", False)
+        include_suppressible = _flag(params, "includeSuppressible", False)
+        base = url.split("/content/")[0]
+        version = urlsplit(url).path.split("/content/")[1].split("/")[0]
+        relations = []
+        for row in self._lines("rel", _cui_key(cui)):
+            if sabs is not None and row[10] not in sabs:
+                continue
+            if labels is not None and row[3] not in labels:
+                continue
+            if additional is not None and row[7] not in additional:
+                continue
+            if (not include_obsolete and row[14] == "O") or (not include_suppressible and row[14] in ("E", "Y")):
+                continue
+            relations.append({
+                "classType": "ConceptRelation",
+                "ui": row[8],
+                "relationLabel": row[3],
+                "additionalRelationLabel": row[7],
+                "rootSource": row[10],
+                "relatedId": f"{base}/content/{version}/CUI/{row[4]}",
+                "relatedIdName": self._preferred_name(self._atoms(row[4])),
+                "obsolete": row[14] == "O",
+                "suppressible": row[14] in ("O", "E", "Y"),
+                "sourceOriginated": row[11] == row[10],
+            })
+        if not relations:
+            raise _http_error(url, 404, "Not Found")
+        return _page(relations, params)
+
+    def _search(self, url:str, params:dict) -> dict:
+        search_type = params.get("searchType", "words")
+        if search_type == "exact":
+            index, key = "exact", params["string"].casefold()
+            matches = lambda text: text.casefold() == key
+        elif search_type == "normalizedString":
+            index, key = "norm", normalize_string(params["string"])
+            matches = lambda text: normalize_string(text) == key
+        else:
+            raise _http_error(url, 501, f"searchType {search_type} not supported by RRFBackend")
+        if params.get("inputType", "atom") != "atom" or params.get("returnIdType", "concept") != "concept":
+            raise _http_error(url, 501, "only inputType=atom, returnIdType=concept are supported by RRFBackend")
+
+        sabs = _csv(params, "sabs")
+        include_obsolete = _flag(params, "includeObsolete", False)
+        include_suppressible = _flag(params, "includeSuppressible", False)
+        found = {}
+        for atom in self._lines("conso", _string_key(key), index=index):
+            if not matches(atom[14]) or atom[0] in found:
+                continue
+            if sabs is not None and atom[11] not in sabs:
+                continue
+            if (not include_obsolete and atom[16] == "O") or (not include_suppressible and atom[16] in ("E", "Y")):
+                continue
+            found[atom[0]] = atom[11]
+        results = [
+            {"ui": cui, "rootSource": sab, "name": self._preferred_name(self._atoms(cui))}
+            for cui, sab in found.items()
+        ]
+        page = _page(results, params)
+        page.pop("pageCount")
+        page["result"] = {"classType": "searchResults", "results": page["result"]}
+        return page
@@ -0,0 +1,98 @@
+import heapq
+import itertools
+import math
+import threading
+from concurrent.futures import Executor, Future
+
+
+# Priority classes, most urgent first. Any int works; lower runs sooner.
+PRIORITIES = {"interactive": 0, "normal": 1, "bulk": 2}
+
+
+def priority_level(priority:str | int) -> int:
+    if isinstance(priority, int):
+        return priority
+    try:
+        return PRIORITIES[priority]
+    except KeyError:
+        raise ValueError(f"priority must be an int or one of {list(PRIORITIES)}") from None
+
+
+class PriorityExecutor(Executor):
+    """Thread pool whose queue is ordered by priority class, then deadline, then arrival.
+
+    Work submitted with :meth:`schedule` at a more urgent priority is picked
+    up by the next free worker, however much lower-priority work is queued;
+    within a class, tasks with the earliest deadline (a ``time.monotonic()``
+    value) go first. Plain :meth:`submit` uses the ``normal`` class.
+    Workers are started on demand up to ``max_workers``.
+    """
+
+    def __init__(self, max_workers:int, thread_name_prefix:str="umls"):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._idle = 0
+        self._shutdown = False
+
+    def schedule(self, priority:str | int, deadline:float | None, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        entry = (priority_level(priority), math.inf if deadline is None else deadline, next(self._seq),
+                 future, fn, args, kwargs)
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            heapq.heappush(self._queue, entry)
+            if self._idle:
+                self._idle -= 1
+                self._cond.notify()
+            elif len(self._threads) < self._max_workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"{self._thread_name_prefix}_{len(self._threads)}")
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        return self.schedule(PRIORITIES["normal"], None, fn, *args, **kwargs)
+
+    def queued(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                future, fn, args, kwargs = heapq.heappop(self._queue)[3:]
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self, wait:bool=True, *, cancel_futures:bool=False):
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for entry in self._queue:
+                    entry[3].cancel()
+                self._queue.clear()
+            self._idle = 0
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                if thread is not threading.current_thread():
+                    thread.join()
@@ -0,0 +1,49 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from umls_api_client import rrf
+from umls_api_client.UMLS import UMLS
+
+
+RRF_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "rrf")
+
+
+@pytest.fixture(scope="session")
+def index_dir(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("index"))
+    rrf.build_index(RRF_FIXTURES, path, release="TEST")
+    return path
+
+
+@pytest.fixture
+def umls(index_dir):
+    """A client answered offline from the fixture release in ``fixtures/rrf``."""
+    backend = rrf.RRFBackend(index_dir)
+    client = UMLS("test", backend=backend)
+    yield client
+    client.close()
+    backend.close()
+
+
+class _NotFound(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    """A local server that answers every request with 404."""
+    server = HTTPServer(("127.0.0.1", 0), _NotFound)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
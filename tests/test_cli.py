@@ -0,0 +1,24 @@
+import json
+
+from umls_api_client import cli
+
+
+def test_failed_rows_do_not_contain_the_api_key(base_url, tmp_path):
+    output = tmp_path / "out.ndjson"
+    status = cli.main(["retrieve_cui_info", "--id", "C1", "--api-key", "SECRET-KEY", "--base-url", base_url,
+                       "--rate", "1000", "-o", str(output)])
+    assert status == 1
+    text = output.read_text()
+    assert "SECRET-KEY" not in text
+    row = json.loads(text)
+    assert (row["id"], row["error"], row["status_code"]) == ("C1", "HTTPError", 404)
+    assert "apiKey=***" in row["message"]
+
+
+def test_blank_input_lines_are_not_requested(base_url, tmp_path):
+    ids = tmp_path / "ids.txt"
+    ids.write_text("C1\n\n   \nC2\n")
+    output = tmp_path / "out.ndjson"
+    cli.main(["retrieve_cui_info", str(ids), "--api-key", "k", "--base-url", base_url, "--rate", "1000",
+              "-o", str(output)])
+    assert sorted(json.loads(line)["id"] for line in output.read_text().splitlines()) == ["C1", "C2"]
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from umls_api_client.ratelimiter import TokenBucket
+from umls_api_client.UMLS import UMLS
+
+
+def test_closing_a_view_leaves_the_client_open(tmp_path):
+    umls = UMLS("test", rate_limit_file=str(tmp_path / "bucket"), cache=str(tmp_path / "cache.db"))
+    for view in (umls.streaming(4), umls.prioritized("bulk"), umls.streaming(4)._batch_view()):
+        view.close()
+    assert umls._rate_limiter._fd is not None
+    assert umls._executor.submit(lambda: 42).result(5) == 42
+    umls._cache.set("https://example.org/x", {}, {"ok": True})
+    assert umls._cache.get("https://example.org/x", {}) == {"ok": True}
+
+    umls.close()
+    assert umls._rate_limiter._fd is None
+    with pytest.raises(RuntimeError):
+        umls._executor.submit(lambda: None)
+
+
+def test_close_leaves_a_caller_supplied_rate_limiter_open(tmp_path):
+    bucket = TokenBucket(10, shared_path=str(tmp_path / "bucket"))
+    with UMLS("test", rate_limiter=bucket):
+        pass
+    assert bucket._fd is not None
+    bucket.close()
+
+
+def test_async_close_of_a_view_keeps_the_session(tmp_path):
+    pytest.importorskip("aiohttp")
+    from umls_api_client.AsyncUMLS import AsyncUMLS
+
+    async def run():
+        umls = AsyncUMLS("test", rate_limit_file=str(tmp_path / "bucket"))
+        session = umls._get_session()
+        await umls.prioritized().close()
+        assert not session.closed and umls._rate_limiter._fd is not None
+        await umls.close()
+        assert session.closed and umls._rate_limiter._fd is None
+
+    asyncio.run(run())
+
+
+def test_connection_pool_covers_every_worker():
+    with UMLS("test", requests_per_second=200, expected_latency=0.5) as umls:
+        assert umls._executor._max_workers == 200
+        assert umls._session.get_adapter("https://uts-ws.nlm.nih.gov")._pool_maxsize == 200
+    with UMLS("test", max_workers=8, pool_maxsize=32) as umls:
+        assert umls._session.get_adapter("https://uts-ws.nlm.nih.gov")._pool_maxsize == 32
+
+
+@pytest.mark.parametrize("kwargs, limit", [({"max_concurrency": 200}, 200),
+                                           ({"max_concurrency": 200, "pool_maxsize": 50}, 50)])
+def test_async_connection_limit_follows_max_concurrency(kwargs, limit):
+    pytest.importorskip("aiohttp")
+    from umls_api_client.AsyncUMLS import AsyncUMLS
+
+    async def run():
+        async with AsyncUMLS("test", **kwargs) as umls:
+            return umls._get_session().connector.limit
+
+    assert asyncio.run(run()) == limit
+
+
+def test_views_share_one_in_flight_gauge():
+    from umls_api_client.instrumentation import Instrumentation
+
+    class Gauge(Instrumentation):
+        def __init__(self):
+            self.values = []
+
+        def on_inflight(self, count):
+            self.values.append(count)
+
+    gauge = Gauge()
+    with UMLS("test", instrumentation=gauge) as umls:
+        views = [umls.prioritized("bulk"), umls.streaming(4), umls.typed(), umls.streaming(4)._batch_view()]
+        for client in views + [umls]:
+            client._on_wire(1)
+        for client in views + [umls]:
+            client._on_wire(-1)
+    assert gauge.values == [1, 2, 3, 4, 5, 4, 3, 2, 1, 0]
+
+
+def test_streaming_skips_blank_lines(umls, tmp_path):
+    requested = []
+    get = umls._backend.get
+    umls._backend.get = lambda url, params: requested.append(url) or get(url, params)
+    path = tmp_path / "cuis.txt"
+    path.write_text("C0000001\n\n  \r\nC0000003\r\n\n")
+    with open(path) as f:
+        streamed = dict(umls.streaming(2).retrieve_cui_info(f))
+    assert sorted(streamed) == ["C0000001", "C0000003"]
+    assert len(requested) == 2
+    bundles = dict(umls.streaming(2).retrieve_concepts(["", "C0000003\n"], parts=["info"]))
+    assert list(bundles) == ["C0000003"]
+
+
+def test_async_streaming_skips_blank_lines(index_dir):
+    pytest.importorskip("aiohttp")
+    from umls_api_client.AsyncUMLS import AsyncUMLS
+    from umls_api_client.rrf import RRFBackend
+
+    async def lines():
+        for line in ["C0000001\n", "\n", "C0000002\n", "   \n"]:
+            yield line
+
+    async def run():
+        backend = RRFBackend(index_dir)
+        async with AsyncUMLS("test", backend=backend) as umls:
+            streaming = umls.streaming(2)
+            from_sync = [id async for id, _ in streaming.retrieve_cui_info(["", "C0000003\n"])]
+            from_async = [id async for id, _ in streaming.retrieve_cui_info(lines())]
+        backend.close()
+        return from_sync, sorted(from_async)
+
+    assert asyncio.run(run()) == (["C0000003"], ["C0000001", "C0000002"])
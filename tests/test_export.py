@@ -0,0 +1,54 @@
+import json
+import os
+
+from umls_api_client.export import BulkExportJob
+from umls_api_client.UMLS import UMLS
+
+
+def _rows(output_dir):
+    rows = []
+    for name in sorted(os.listdir(output_dir)):
+        if name.startswith("part-"):
+            with open(os.path.join(output_dir, name), encoding="utf-8") as f:
+                rows.extend(json.loads(line) for line in f)
+    return rows
+
+
+def test_exports_each_id_once(umls, tmp_path):
+    job = BulkExportJob(umls, "retrieve_cui_info", str(tmp_path), flush_every=1, window=4)
+    counts = job.run(["C0000001\n", "C0000002", "C0000001", "", "C0000002\r\n", "C0000001"])
+    assert counts == {"written": 2, "failed": 0, "skipped_before": 0}
+    assert sorted(row["id"] for row in _rows(str(tmp_path))) == ["C0000001", "C0000002"]
+    assert job.completed_ids() == {"C0000001", "C0000002"}
+
+
+def test_repeated_failures_are_logged_once_and_retried_later(umls, tmp_path):
+    job = BulkExportJob(umls, "retrieve_cui_info", str(tmp_path))
+    counts = job.run(["C0000009", "C0000003", "C0000009"])
+    assert counts == {"written": 1, "failed": 1, "skipped_before": 0}
+    with open(os.path.join(str(tmp_path), "errors.jsonl"), encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == ["C0000009"]
+
+    counts = job.run(["C0000003", "C0000009", "C0000001", "C0000001"])
+    assert counts == {"written": 1, "failed": 1, "skipped_before": 1}
+    assert [row["id"] for row in _rows(str(tmp_path))] == ["C0000003", "C0000001"]
+
+
+def test_resume_discards_rows_after_the_last_checkpoint(umls, tmp_path):
+    job = BulkExportJob(umls, "retrieve_cui_info", str(tmp_path), flush_every=1)
+    job.run(["C0000001"])
+    with open(os.path.join(str(tmp_path), "part-00000.jsonl"), "a", encoding="utf-8") as f:
+        f.write('{"id":"C0000002","result":"half-written')  # a crash mid-flush
+    job.run(["C0000001", "C0000002"])
+    assert [row["id"] for row in _rows(str(tmp_path))] == ["C0000001", "C0000002"]
+
+
+def test_error_log_does_not_contain_the_api_key(base_url, tmp_path):
+    with UMLS("SECRET-KEY", base_url=base_url, requests_per_second=1000) as umls:
+        BulkExportJob(umls, "retrieve_cui_atoms", str(tmp_path)).run(["C1"])
+    with open(os.path.join(str(tmp_path), "errors.jsonl"), encoding="utf-8") as f:
+        text = f.read()
+    assert "SECRET-KEY" not in text
+    row = json.loads(text)
+    assert (row["id"], row["error"], row["status_code"]) == ("C1", "HTTPError", 404)
+    assert "apiKey=***" in row["message"]
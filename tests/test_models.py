@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from umls_api_client import models
+from umls_api_client.results import BatchError
+
+
+def test_parse_builds_records_by_class_type():
+    atom = models.parse_item({"classType": "Atom", "ui": "A1", "name": "Aspirin", "termType": "MH",
+                              "rootSource": "MSH", "code": "https://uts/content/current/source/MSH/D001"})
+    assert isinstance(atom, models.Atom)
+    assert (atom.ui, atom.root_source, atom.code) == ("A1", "MSH", "D001")
+    assert models.parse_item({"ui": "C1", "rootSource": "MSH", "name": "x"}) == models.SearchHit("C1", "x", "MSH")
+    assert models.parse_item({"classType": "Unknown", "ui": "x"}) == {"classType": "Unknown", "ui": "x"}
+
+
+def test_page_parses_lazily():
+    page = models.parse({"pageNumber": 1, "pageSize": 25, "pageCount": 1,
+                         "result": [{"classType": "Definition", "value": "v", "rootSource": "NCI"}]})
+    assert page._records is None
+    assert page.record == models.Definition("v", "NCI", None)
+    assert page.to_columns() == {"value": ["v"], "root_source": ["NCI"], "source_originated": [None]}
+
+
+def test_plain_client_returns_json(umls):
+    assert isinstance(umls.retrieve_cui_info("C0000001"), dict)
+
+
+def test_typed_view_parses_single_and_batch_calls(umls):
+    typed = umls.typed()
+    page = typed.retrieve_cui_info("C0000001")
+    assert isinstance(page, models.Page)
+    assert page.record.name == "Heart Attack"
+    assert page.record.semantic_types == ("Disease or Syndrome",)
+
+    results = typed.retrieve_cui_atoms(["C0000001", "C0000009"], all_pages=True)
+    assert [atom.ui for atom in results["C0000001"]] == ["A0000001", "A0000002", "A0000003"]
+    assert all(isinstance(atom, models.Atom) for atom in results["C0000001"])
+    assert results.errors["C0000009"].status_code == 404
+    assert [atom.language for atom in typed.retrieve_cui_atoms("C0000002", all_pages=True)] == ["ENG", "FRE"]
+
+    hits = typed.retrieve_cuis(["heart attack"], searchType="exact")["heart attack"]
+    assert hits.records == [models.SearchHit("C0000001", "Heart Attack", "MSH")]
+
+
+def test_typed_retry_failed_stays_typed(umls):
+    results = umls.typed().retrieve_cui_definitions(["C0000003", "C0000001"])
+    retried = results.retry_failed()
+    assert isinstance(retried["C0000001"], models.Page)
+    assert retried.failed_ids == ["C0000003"]
+
+
+def test_typed_streaming_and_bundles(umls):
+    streamed = dict(umls.typed().streaming(2).retrieve_cui_relations(["C0000001", "C0000003"], all_pages=True))
+    assert [r.related_id for r in streamed["C0000001"]] == ["C0000003", "C0000002"]
+    assert isinstance(streamed["C0000003"], BatchError)
+
+    bundle = umls.typed().retrieve_concepts(["C0000001"], parts=["info", "definitions"])["C0000001"]
+    assert bundle["info"].record.ui == "C0000001"
+    assert [d.root_source for d in bundle["definitions"]] == ["MSH", "NCI"]
+
+
+def test_composite_methods_on_a_typed_view_get_raw_json(umls):
+    normalized = umls.typed().retrieve_cuis_normalized(["Heart attack"], searchTypes=["exact"])
+    assert [hit["ui"] for hit in normalized["Heart attack"]["result"]["results"]] == ["C0000001"]
+
+
+def test_typed_async_client(index_dir):
+    pytest.importorskip("aiohttp")
+    from umls_api_client.AsyncUMLS import AsyncUMLS
+    from umls_api_client.rrf import RRFBackend
+
+    async def run():
+        backend = RRFBackend(index_dir)
+        async with AsyncUMLS("test", backend=backend) as umls:
+            typed = umls.typed()
+            page = await typed.retrieve_cui_info("C0000003")
+            atoms = [atom async for atom in typed.retrieve_cui_atoms("C0000001", all_pages=True)]
+            batch = await typed.retrieve_cui_definitions(["C0000001"], all_pages=True)
+        backend.close()
+        return page, atoms, batch
+
+    page, atoms, batch = asyncio.run(run())
+    assert page.record.name == "Aspirin"
+    assert [type(atom) for atom in atoms] == [models.Atom] * 3
+    assert [d.value for d in batch["C0000001"]] == ["NECROSIS of the MYOCARDIUM.", "Death of heart muscle."]
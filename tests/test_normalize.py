@@ -0,0 +1,41 @@
+from umls_api_client.normalize import canonicalize
+
+
+class _Counting:
+    def __init__(self, backend):
+        self.backend = backend
+        self.searches = []
+
+    def get(self, url, params):
+        self.searches.append((params["string"], params["searchType"]))
+        return self.backend.get(url, params)
+
+
+def test_canonicalize_is_conservative():
+    assert canonicalize("Heart  Attacks!") == canonicalize("heart attack")
+    assert canonicalize("AIDS") != canonicalize("aid")
+    assert canonicalize("diabetes") == "diabetes"
+
+
+def _counting(umls):
+    counting = _Counting(umls._backend)
+    umls._backend = counting
+    return counting
+
+
+def test_a_missing_group_costs_one_request_per_search_type(umls):
+    counting = _counting(umls)
+    mentions = ["Nonexistent findings", "nonexistent finding", "NONEXISTENT-FINDING", "nonexistent  findings."]
+    results = umls.retrieve_cuis_normalized(mentions, searchTypes=["exact", "normalizedString"])
+    assert len(counting.searches) == 2
+    assert set(results) == set(mentions)
+
+
+def test_surface_forms_are_searched_again_only_when_asked(umls):
+    counting = _counting(umls)
+    mentions = ["Nonexistent findings", "nonexistent finding", "heart attack", "Heart Attack"]
+    results = umls.retrieve_cuis_normalized(mentions, searchTypes=["exact", "normalizedString"],
+                                            surfaceSearchType="exact")
+    assert sorted(counting.searches[-2:]) == [("Nonexistent findings", "exact"), ("nonexistent finding", "exact")]
+    assert len(counting.searches) == 5
+    assert results["heart attack"]["result"]["results"][0]["ui"] == "C0000001"
@@ -0,0 +1,184 @@
+import threading
+import time
+
+import pytest
+
+from umls_api_client import ratelimiter
+from umls_api_client.ratelimiter import TokenBucket
+
+
+class FakeClock:
+    """Stands in for the ``time`` module inside ratelimiter; only moves when told to."""
+
+    def __init__(self, now:float=1000.0):
+        self.now = now
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimiter, "time", clock)
+    return clock
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+def test_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    with pytest.raises(ValueError):
+        TokenBucket(10, burst=0)
+
+
+def test_spaces_requests_at_the_rate(clock):
+    bucket = TokenBucket(10)
+    assert [bucket.reserve() for _ in range(4)] == pytest.approx([0.0, 0.1, 0.2, 0.3])
+    clock.advance(0.3)
+    assert bucket.reserve() == pytest.approx(0.1)
+
+
+def test_burst_is_free_then_spaced(clock):
+    bucket = TokenBucket(10, burst=3)
+    assert [bucket.reserve() for _ in range(5)] == pytest.approx([0.0, 0.0, 0.0, 0.1, 0.2])
+
+
+def test_idle_time_refills_at_most_burst(clock):
+    bucket = TokenBucket(10, burst=2)
+    for _ in range(2):
+        bucket.reserve()
+    clock.advance(60)
+    assert [bucket.reserve() for _ in range(3)] == pytest.approx([0.0, 0.0, 0.1])
+
+
+def test_reserving_several_tokens(clock):
+    bucket = TokenBucket(10)
+    assert bucket.reserve(5) == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_acquire_sleeps_for_the_reserved_wait(clock):
+    bucket = TokenBucket(4)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.25)
+    assert sum(clock.slept) == pytest.approx(0.25)
+
+
+def test_throttle_halves_once_per_second_and_pauses(clock):
+    bucket = TokenBucket(8, min_rate=3)
+    bucket.reserve()
+    bucket.throttle(pause=2.0)
+    assert bucket.rate == 4
+    assert bucket.reserve() == pytest.approx(2.0)
+    bucket.throttle()
+    assert bucket.rate == 4  # a burst of 429s counts once
+    clock.advance(1.0)
+    bucket.throttle()
+    assert bucket.rate == 3  # never below min_rate
+
+
+def test_recover_climbs_back_to_the_configured_rate(clock):
+    bucket = TokenBucket(20)
+    bucket.throttle()
+    assert bucket.rate == 10
+    bucket.recover()
+    assert bucket.rate == 11
+    for _ in range(20):
+        bucket.recover()
+    assert bucket.rate == 20
+
+
+def test_shared_path_shares_the_budget(clock, tmp_path):
+    path = str(tmp_path / "bucket")
+    first, second = TokenBucket(10, shared_path=path), TokenBucket(10, shared_path=path)
+    try:
+        assert first.reserve() == 0.0
+        assert second.reserve() == pytest.approx(0.1)
+        assert first.reserve() == pytest.approx(0.2)
+    finally:
+        first.close()
+        second.close()
+    assert first._fd is None
+
+
+def _acquire_in_thread(bucket, priority, order, tokens=1, errors=None):
+    def run():
+        try:
+            bucket.acquire(tokens, priority=priority)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors.append((priority, e))
+        else:
+            order.append(priority)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_priority_waiters_get_tokens_most_urgent_first(clock):
+    bucket = TokenBucket(50)
+    bucket.reserve()  # the next token is due in 0.02s of fake time, which stands still
+    order = []
+    threads = []
+    for priority in (2, 1, 2, 0):
+        threads.append(_acquire_in_thread(bucket, priority, order))
+        _wait_for(lambda: len(bucket._waiters) == len(threads))
+    for served in range(1, 5):
+        clock.advance(bucket.interval)
+        _wait_for(lambda: len(order) == served)
+    assert order == [0, 1, 2, 2]
+    for thread in threads:
+        thread.join(5)
+    assert bucket._waiters == []
+
+
+def test_head_leaving_hands_off_to_the_next_waiter(clock, monkeypatch):
+    bucket = TokenBucket(50)
+    bucket.reserve()
+    leave = threading.Event()
+    peek = bucket._peek
+
+    def failing_peek(tokens):
+        # The urgent caller asks for 2 tokens; make its turn fail once it is head.
+        if tokens == 2 and leave.is_set():
+            raise RuntimeError("caller went away")
+        return peek(tokens)
+
+    monkeypatch.setattr(bucket, "_peek", failing_peek)
+    order, errors = [], []
+    waiting = _acquire_in_thread(bucket, 1, order)
+    _wait_for(lambda: len(bucket._waiters) == 1)
+    head = _acquire_in_thread(bucket, 0, order, tokens=2, errors=errors)
+    _wait_for(lambda: len(bucket._waiters) == 2 and bucket._waiters[0][0] == 0)
+    # Let the lower-priority waiter's timed wait lapse so it parks untimed behind the head.
+    time.sleep(3 * bucket.interval)
+
+    leave.set()
+    head.join(5)
+    assert [priority for priority, _ in errors] == [0]
+    _wait_for(lambda: len(bucket._waiters) == 1)
+    assert order == []
+    clock.advance(bucket.interval)
+    waiting.join(5)
+    assert order == [1]
+    assert bucket._waiters == []
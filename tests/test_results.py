@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+import requests
+
+from umls_api_client.results import BatchError, BatchResult
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+class _ClientResponseError(Exception):
+    # Shaped like aiohttp.ClientResponseError, which carries .status instead of .response
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+def _result(ok, failed, resubmit=None):
+    result = BatchResult(resubmit)
+    result.update(ok)
+    result.errors.update({id: BatchError(_http_error(status)) for id, status in failed.items()})
+    return result
+
+
+def test_batch_error_status_code():
+    assert BatchError(_http_error(404)).status_code == 404
+    assert BatchError(_ClientResponseError(503)).status_code == 503
+    assert BatchError(requests.ConnectionError("reset")).status_code is None
+    assert repr(BatchError(_http_error(500))).startswith("BatchError(status_code=500,")
+
+
+def test_successes_are_a_plain_dict():
+    result = _result({"C1": {"ui": "C1"}}, {"C2": 404, "C3": 500})
+    assert isinstance(result, dict)
+    assert dict(result) == {"C1": {"ui": "C1"}}
+    assert not result.ok
+    assert result.failed_ids == ["C2", "C3"]
+    assert _result({"C1": 1}, {}).ok
+
+
+def test_raise_for_errors():
+    _result({"C1": 1}, {}).raise_for_errors()
+    with pytest.raises(requests.HTTPError) as raised:
+        _result({"C1": 1}, {"C2": 429}).raise_for_errors()
+    assert raised.value.response.status_code == 429
+
+
+def test_retry_failed_resubmits_only_failures_and_merges():
+    calls = []
+
+    def resubmit(ids):
+        calls.append(ids)
+        return _result({"C2": 2}, {"C3": 500}, resubmit)
+
+    first = _result({"C1": 1}, {"C2": 503, "C3": 500}, resubmit)
+    merged = first.retry_failed()
+    assert calls == [["C2", "C3"]]
+    assert dict(merged) == {"C1": 1, "C2": 2}
+    assert merged.failed_ids == ["C3"]
+    assert first.failed_ids == ["C2", "C3"]  # the original is left alone
+
+    merged.retry_failed()
+    assert calls[-1] == ["C3"]
+
+
+def test_retry_failed_on_async_client_is_awaitable():
+    async def resubmit(ids):
+        return _result({id: id.lower() for id in ids}, {})
+
+    merged = asyncio.run(_result({"C1": "c1"}, {"C2": 503}, resubmit).retry_failed())
+    assert dict(merged) == {"C1": "c1", "C2": "c2"}
+    assert merged.ok
+
+
+def test_retry_failed_needs_a_resubmit_function():
+    with pytest.raises(RuntimeError):
+        _result({}, {"C1": 500}).retry_failed()
+
+
+def test_to_json_masks_the_api_key():
+    response = requests.Response()
+    response.status_code = 404
+    response.url = "https://uts-ws.nlm.nih.gov/rest/content/current/CUI/C1?apiKey=SECRET-KEY&pageSize=25"
+    error = BatchError(requests.HTTPError(f"404 Client Error: Not Found for url: {response.url}", response=response))
+    row = error.to_json()
+    assert row["error"] == "HTTPError" and row["status_code"] == 404
+    assert "SECRET-KEY" not in row["message"]
+    assert row["message"].endswith("C1?apiKey=***&pageSize=25")
@@ -0,0 +1,106 @@
+import os
+from array import array
+
+import pytest
+
+from umls_api_client import rrf
+from umls_api_client.results import BatchError
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "rrf")
+INDEXES = ("conso", "exact", "norm", "def", "rel", "sty")
+
+
+def _read_index(index_dir, name):
+    values = array("Q")
+    with open(os.path.join(index_dir, f"{name}.idx"), "rb") as f:
+        values.frombytes(f.read())
+    return values
+
+
+def test_build_index_writes_sorted_indexes(index_dir):
+    for name in INDEXES:
+        values = _read_index(index_dir, name)
+        assert len(values) > 0
+        assert list(values) == sorted(values)
+    assert len(_read_index(index_dir, "conso")) == 6
+    assert rrf.RRFBackend(index_dir).release == "TEST"
+
+
+def test_build_index_merges_sorted_chunks(index_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(rrf, "_SORT_CHUNK", 2)
+    rrf.build_index(FIXTURES, str(tmp_path), release="TEST")
+    for name in INDEXES:
+        assert _read_index(str(tmp_path), name) == _read_index(index_dir, name)
+
+
+def test_build_index_requires_mrconso(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        rrf.build_index(str(tmp_path), str(tmp_path / "index"))
+
+
+def test_cui_info(umls):
+    concept = umls.retrieve_cui_info(["C0000003"])["C0000003"]["result"]
+    assert concept["name"] == "Aspirin"
+    assert concept["atomCount"] == 1
+    assert [t["tui"] for t in concept["semanticTypes"]] == ["T109", "T121"]
+
+
+def test_unknown_cui_is_a_404_batch_error(umls):
+    results = umls.retrieve_cui_info(["C0000001", "C0000009"])
+    assert list(results) == ["C0000001"]
+    error = results.errors["C0000009"]
+    assert isinstance(error, BatchError)
+    assert error.status_code == 404
+
+
+def test_atoms(umls):
+    atoms = umls.retrieve_cui_atoms(["C0000001"], all_pages=True)["C0000001"]
+    assert [atom["ui"] for atom in atoms] == ["A0000001", "A0000002", "A0000003"]
+    current = umls.retrieve_cui_atoms(["C0000001"], includeObsolete=False, sabs=["MSH"], all_pages=True)
+    assert [atom["name"] for atom in current["C0000001"]] == ["Heart Attack"]
+    preferred = umls.retrieve_cui_atoms(["C0000002"], preferred=True, language="FRE")["C0000002"]["result"]
+    assert preferred["name"] == "Diabète sucré"
+
+
+def test_definitions(umls):
+    definitions = umls.retrieve_cui_definitions(["C0000001"], all_pages=True)["C0000001"]
+    assert [d["rootSource"] for d in definitions] == ["MSH", "NCI"]
+    results = umls.retrieve_cui_definitions(["C0000003"])
+    assert results.errors["C0000003"].status_code == 404
+
+
+def test_relations(umls):
+    relations = umls.retrieve_cui_relations(["C0000001"], all_pages=True)["C0000001"]
+    assert [(r["ui"], r["relatedIdName"]) for r in relations] == [("R0000001", "Aspirin"),
+                                                                 ("R0000002", "Diabetes mellitus")]
+    obsolete = umls.retrieve_cui_relations(["C0000001"], includeObsolete=True, sabs=["SNOMEDCT_US"], all_pages=True)
+    assert [r["additionalRelationLabel"] for r in obsolete["C0000001"]] == ["", "associated_with"]
+
+
+def test_exact_search(umls):
+    results = umls.retrieve_cuis(["heart attack", "Myocardial Infarction", "aspirin tablet"], searchType="exact",
+                                 all_pages=True)
+    assert [hit["ui"] for hit in results["heart attack"]] == ["C0000001"]
+    assert [hit["ui"] for hit in results["Myocardial Infarction"]] == ["C0000001"]
+    assert results["aspirin tablet"] == []
+
+
+def test_normalized_string_search(umls):
+    results = umls.retrieve_cuis(["infarction, myocardial", "mellitus diabetes"], searchType="normalizedString",
+                                 all_pages=True)
+    assert [hit["ui"] for hit in results["infarction, myocardial"]] == ["C0000001"]
+    assert [hit["ui"] for hit in results["mellitus diabetes"]] == ["C0000002"]
+
+
+def test_search_skips_obsolete_atoms_unless_asked(umls):
+    assert umls.retrieve_cuis(["Infarction, Myocardial"], searchType="exact", all_pages=True)[
+        "Infarction, Myocardial"] == []
+    results = umls.retrieve_cuis(["Infarction, Myocardial"], searchType="exact", includeObsolete=True,
+                                 all_pages=True)
+    assert [hit["ui"] for hit in results["Infarction, Myocardial"]] == ["C0000001"]
+
+
+def test_unsupported_endpoint_is_501(umls):
+    results = umls.retrieve_tui_info(["T047"])
+    assert results.errors["T047"].status_code == 501
@@ -0,0 +1,115 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from umls_api_client.scheduler import PRIORITIES, PriorityExecutor, priority_level
+
+
+@pytest.fixture
+def blocked_executor():
+    # One worker, held busy until the test releases it, so everything else queues up.
+    executor = PriorityExecutor(max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait()
+
+    blocker = executor.submit(block)
+    assert started.wait(5)
+    yield executor, release, blocker
+    release.set()
+    executor.shutdown()
+
+
+def test_priority_level():
+    assert priority_level("interactive") == PRIORITIES["interactive"] == 0
+    assert priority_level("bulk") == 2
+    assert priority_level(7) == 7
+    with pytest.raises(ValueError):
+        priority_level("urgent")
+
+
+def test_runs_most_urgent_class_first(blocked_executor):
+    executor, release, _ = blocked_executor
+    order = []
+    futures = [executor.schedule(priority, None, order.append, priority)
+               for priority in ("bulk", "normal", "bulk", "interactive", "normal")]
+    assert executor.queued() == 5
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert order == ["interactive", "normal", "normal", "bulk", "bulk"]
+
+
+def test_orders_by_deadline_then_arrival_within_a_class(blocked_executor):
+    executor, release, _ = blocked_executor
+    order = []
+    futures = [executor.schedule("normal", deadline, order.append, name)
+               for name, deadline in [("none-1", None), ("late", 20.0), ("early", 10.0), ("none-2", None),
+                                      ("early-2", 10.0)]]
+    futures.append(executor.schedule("interactive", None, order.append, "interactive"))
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert order == ["interactive", "early", "early-2", "late", "none-1", "none-2"]
+
+
+def test_submit_is_normal_priority(blocked_executor):
+    executor, release, _ = blocked_executor
+    order = []
+    futures = [executor.schedule("bulk", None, order.append, "bulk"), executor.submit(order.append, "submit"),
+               executor.schedule("interactive", None, order.append, "interactive")]
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert order == ["interactive", "submit", "bulk"]
+
+
+def test_exceptions_are_set_on_the_future():
+    with PriorityExecutor(max_workers=2) as executor:
+        future = executor.submit(int, "not a number")
+        with pytest.raises(ValueError):
+            future.result(5)
+        assert executor.submit(int, "12").result(5) == 12
+
+
+def test_shutdown_cancels_queued_futures(blocked_executor):
+    executor, release, blocker = blocked_executor
+    ran = []
+    queued = [executor.schedule(priority, None, ran.append, priority) for priority in ("interactive", "bulk")]
+    executor.shutdown(wait=False, cancel_futures=True)
+    assert all(future.cancelled() for future in queued)
+    assert executor.queued() == 0
+    with pytest.raises(RuntimeError):
+        executor.submit(ran.append, "late")
+
+    release.set()
+    assert blocker.result(5) is None  # work already running is allowed to finish
+    executor.shutdown(wait=True)
+    assert ran == []
+    with pytest.raises(CancelledError):
+        queued[0].result()
+
+
+def test_shutdown_without_cancel_drains_the_queue(blocked_executor):
+    executor, release, _ = blocked_executor
+    ran = []
+    queued = [executor.schedule("bulk", None, ran.append, i) for i in range(3)]
+    executor.shutdown(wait=False)
+    release.set()
+    executor.shutdown(wait=True)
+    assert [future.result() for future in queued] == [None, None, None]
+    assert ran == [0, 1, 2]
+
+
+def test_workers_start_on_demand():
+    executor = PriorityExecutor(max_workers=4)
+    assert executor._threads == []
+    executor.submit(lambda: None).result(5)
+    assert len(executor._threads) == 1
+    executor.shutdown()
+    with pytest.raises(ValueError):
+        PriorityExecutor(max_workers=0)